@@ -1,5 +1,5 @@
 import os
-from . import twtrconvo, tweets, plots
+import importlib
 
 __version__ = '0.1.0'
 __license__ = 'MIT'
@@ -10,5 +10,19 @@ PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
 __all__ = [
     'twtrconvo',
     'tweets',
-    'plots'
-]
\ No newline at end of file
+    'plots',
+    'sentiment',
+    'sources',
+    'storage',
+    'timeseries',
+    'stream',
+    'sketches'
+]
+
+
+def __getattr__(name):
+    # Import submodules lazily so importing the package stays cheap
+    if name in __all__:
+        return importlib.import_module('.' + name, __name__)
+    raise AttributeError(
+        'module {!r} has no attribute {!r}'.format(__name__, name))
@@ -1,16 +1,99 @@
 import sys
 import argparse
-from .twtrconvo import main
+from .twtrconvo import main, run_batch, load_tickers
 
 if __name__ == '__main__':
     # Setup Argument Parser
     parser = argparse.ArgumentParser(description='Type a ticker!')
     parser.add_argument('-t', '--ticker', dest='ticker', action='store',
                         help='Ticker symbol that will be analyzed.')
+    parser.add_argument('-T', '--tickers', dest='tickers', nargs='+',
+                        default=[],
+                        help='List of ticker symbols analyzed in batch.')
+    parser.add_argument('-f', '--ticker-file', dest='ticker_file',
+                        action='store',
+                        help='File of ticker symbols (one per line) analyzed '
+                             'in batch.')
     parser.add_argument('-b', '--build-dataset', dest='build',
                         action='store_true',
                         help='Build dataset (default will load saved set)')
+    parser.add_argument('-i', '--incremental', dest='incremental',
+                        action='store_true',
+                        help='Only pull tweets newer than the last build and '
+                             'merge them into the saved dataset.')
+    parser.add_argument('--format', dest='fmt', default='parquet',
+                        choices=['parquet', 'feather', 'csv'],
+                        help='Storage format of built datasets (default '
+                             'parquet).')
+    parser.add_argument('--export', dest='export', default='shared',
+                        choices=['pages', 'shared', 'dashboard', 'json'],
+                        help='Figure export mode: standalone pages, pages '
+                             'sharing one plotly.js, a single dashboard or '
+                             'JSON figures (default shared).')
+    parser.add_argument('--force-figures', dest='force', action='store_true',
+                        help='Render every figure, even those whose inputs '
+                             'have not changed since the last run.')
+    parser.add_argument('--history', dest='history', action='store_true',
+                        help='Append pulled tweets to the time partitioned '
+                             'history store when building.')
+    parser.add_argument('--start', dest='start', action='store',
+                        help='Start of the time window analyzed from the '
+                             'history store (e.g. 2019-01-01).')
+    parser.add_argument('--end', dest='end', action='store',
+                        help='End of the time window analyzed from the '
+                             'history store, inclusive (a date includes the '
+                             'whole day).')
+    parser.add_argument('-p', '--processes', dest='processes', type=int,
+                        default=1,
+                        help='Number of processes used to score sentiment.')
+    parser.add_argument('-s', '--stream', dest='stream', action='store_true',
+                        help='Run the real time streaming mode.')
+    parser.add_argument('--replay', dest='replay', action='store',
+                        help='Recorded tweet dump (json or json lines) '
+                             'replayed in streaming mode.')
+    parser.add_argument('--rate', dest='rate', type=float, default=None,
+                        help='Tweets per second to replay at in streaming '
+                             'mode.')
+    parser.add_argument('--batch-size', dest='batch_size', type=int,
+                        default=1,
+                        help='Number of tweets processed at a time in '
+                             'streaming mode (larger batches trade latency '
+                             'for throughput).')
+    parser.add_argument('--window', dest='window', default='5m',
+                        help='Snapshot window of the streaming mode (e.g. '
+                             '1m, 5m, 1h).')
+    parser.add_argument('--sketch-capacity', dest='capacity', type=int,
+                        default=None,
+                        help='Approximately count ngrams of each streaming '
+                             'window in fixed memory with this many '
+                             'counters.')
+    parser.add_argument('-w', '--workers', dest='workers', type=int,
+                        default=None,
+                        help='Number of tickers analyzed in parallel in '
+                             'batch mode (default all cores).')
     # Cast args to dict
     args = vars(parser.parse_args(sys.argv[1:]))
-
-    main(**args)
\ No newline at end of file
+    # Run batch mode if a list or file of tickers is given
+    tickers = args.pop('tickers')
+    ticker_file = args.pop('ticker_file')
+    workers = args.pop('workers')
+    if ticker_file:
+        tickers += load_tickers(ticker_file)
+    # Pop streaming mode options
+    stream = args.pop('stream')
+    stream_args = {k: args.pop(k) for k in
+                   ['replay', 'rate', 'window', 'batch_size', 'capacity']}
+    if stream:
+        from .stream import main as stream_main
+        tickers = ([args['ticker']] if args['ticker'] else []) + tickers
+        if not tickers:
+            parser.error('streaming mode needs at least one ticker '
+                         '(-t, -T or -f)')
+        stream_main(tickers, processes=args['processes'], **stream_args)
+    elif tickers:
+        ticker = args.pop('ticker')
+        if ticker:
+            tickers.insert(0, ticker)
+        run_batch(tickers, workers=workers, **args)
+    else:
+        main(**args)
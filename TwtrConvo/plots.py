@@ -4,9 +4,49 @@ This module will create the different plotly objects.
 
 import os
 import numpy as np
-from plotly import tools
 import plotly.graph_objs as go
-import plotly.figure_factory as ff
+from copy import deepcopy
+from functools import lru_cache
+
+
+# Static parts of figures are built once and memoized, renders copy them
+# and only patch in their data (so returned figures can be modified)
+TEMPLATE_CACHE_SIZE = 256
+PIE_TRACE = {
+    "hole": .4,
+    "type": "pie"
+}
+
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def _pie_layout(name_1, name_2):
+    """
+        Build the layout of a pair of pie charts.
+    """
+    return {
+        "title": {"text": "Word Frequency"},
+        "grid": {"rows": 1, "columns": 2},
+        "annotations": [
+            {
+                "font": {
+                    "size": 20
+                },
+                "showarrow": False,
+                "text": name_1,
+                "x": 0.20,
+                "y": 0.5
+            },
+            {
+                "font": {
+                    "size": 20
+                },
+                "showarrow": False,
+                "text": name_2,
+                "x": 0.8,
+                "y": 0.5
+            }
+        ]
+    }
 
 
 def create_pie_chart(word_count_1, word_count_2, name_1='Tweet', 
@@ -25,66 +65,287 @@ def create_pie_chart(word_count_1, word_count_2, name_1='Tweet',
     fig = {
       "data": [
         {
+          **PIE_TRACE,
           "values": word_count_1['count'].values[:n],
           "labels": word_count_1['word'].values[:n],
           "domain": {"column": 0},
-          "hole": .4,
-          "type": "pie",
           "name": name_1
         },
         {
+          **PIE_TRACE,
           "values": word_count_2['count'].values[:n],
           "labels": word_count_2['word'].values[:n],
           "domain": {"column": 1},
-          "hole": .4,
-          "type": "pie",
           "name": name_2
         }],
-      "layout": {
-            "title":"Word Frequency",
-            "grid": {"rows": 1, "columns": 2},
-            "annotations": [
-                {
-                    "font": {
-                        "size": 20
-                    },
-                    "showarrow": False,
-                    "text": name_1,
-                    "x": 0.20,
-                    "y": 0.5
-                },
-                {
-                    "font": {
-                        "size": 20
-                    },
-                    "showarrow": False,
-                    "text": name_2,
-                    "x": 0.8,
-                    "y": 0.5
-                }
-            ]
-        }
+      "layout": deepcopy(_pie_layout(name_1, name_2))
     }
 
     return fig
 
 
-def _rotate_point(point, angle, center_point=(0, 0)):
-    """Rotates a point around center_point(origin by default)
-    Angle is in degrees.
-    Rotation is counter-clockwise
+@lru_cache(maxsize=None)
+def _default_template():
+    """
+        Get the default plotly template as a plain dict.
+    """
+    import plotly.io as pio
+
+    return pio.templates[pio.templates.default].to_plotly_json()
+
+
+def _prepare_figure(fig):
+    """
+        Figures built only of dicts are already in plotly's JSON form, so
+        they skip validation (building go.Figure objects), which is most of
+        the cost of serializing them.  The default template validation would
+        have applied is added to their layout.
+
+        Returns:
+            figure and whether it should be validated
+    """
+    if not (isinstance(fig, dict) and
+            isinstance(fig.get('layout', {}), dict) and
+            all(isinstance(trace, dict) for trace in fig.get('data', []))):
+        return fig, True
+    layout = fig.get('layout', {})
+    if 'template' not in layout:
+        layout = {'template': _default_template(), **layout}
+    data = [dict(trace) for trace in fig.get('data', [])]
+    try:
+        # Encode arrays as compact typed arrays like validation does
+        # (plotly >= 6)
+        from _plotly_utils.utils import convert_to_base64
+        convert_to_base64(data)
+    except ImportError:
+        pass
+
+    return {'data': data, 'layout': layout}, False
+
+
+def figure_to_json(fig):
+    """
+        This method will serialize a figure to compact plotly JSON.
+
+        Args:
+            fig (dict or plotly.graph_objs.Figure): figure
+
+        Returns:
+            JSON str
+    """
+    import plotly.io as pio
+
+    fig, validate = _prepare_figure(fig)
+
+    return pio.to_json(fig, validate=validate, pretty=False)
+
+
+def figure_to_html(fig, **kwargs):
+    """
+        This method will render a figure to html.
+
+        Args:
+            fig (dict or plotly.graph_objs.Figure): figure
+            kwargs: other plotly.io.to_html arguments
+
+        Returns:
+            html str
+    """
+    import plotly.io as pio
+
+    fig, validate = _prepare_figure(fig)
+
+    return pio.to_html(fig, validate=validate, **kwargs)
+
+
+# Gauge styles keyed by the sentiment shown, a value is mapped to a needle
+# angle in degrees (counter-clockwise from straight up)
+GAUGES = {
+    'polarity': {
+        'guage_labels': ["-", "-1", "0", "1"],
+        'angle': lambda value: -80.0 * value,
+        'color_labels': ['Polarity', 'Negative', 'Neutral', 'Positive'],
+        'colors': [
+            'rgb(255, 255, 255)', # Black
+            'rgb(255, 102, 102)', # Light Red
+            'rgb(192, 192, 192)', # Grey
+            'rgb(178, 255, 102)' # Light Green
+        ]
+    },
+    'subjectivity': {
+        'guage_labels': ["-", "0", "0.5", "1"],
+        'angle': lambda value: -80.0 * ((value * 2) - 1),
+        'color_labels': ['Subjectivity', 'Very Objective', 'Neutral',
+                         'Very Subjective'],
+        'colors': [
+            'rgb(255, 255, 255)', # Black
+            'rgb(178, 255, 102)', # Light Green
+            'rgb(192, 192, 192)', # Grey
+            'rgb(255, 102, 102)' # Light Red
+        ]
+    }
+}
+# Needle triangle vertices relative to the gauge's center, for a gauge
+# 0.48 wide and 1.0 high in paper coordinates
+NEEDLE = np.array([[-0.005, 0.0], [0.0, 0.15], [0.005, 0.0]])
+NEEDLE_SHAPE = {
+    'type': 'path',
+    'fillcolor': 'rgba(44, 160, 101, 0.5)', # Fill triangle green
+    'line': {'width': 0.5},
+    'xref': 'paper',
+    'yref': 'paper'
+}
+VALUE_ANNOTATION = {
+    'xref': 'paper',
+    'yref': 'paper',
+    'showarrow': False
+}
+HIDDEN_AXIS = {
+    'showticklabels': False,
+    'showgrid': False,
+    'zeroline': False
+}
+
+
+def _rotate_points(points, angles, centers=None):
+    """
+        Rotate the same points by many angles at once (counter-clockwise,
+        in degrees) about the origin, then shift them to each center.
+
+        Args:
+            points (numpy.ndarray): (vertices, 2) points
+            angles (numpy.ndarray): (n,) angles
+            centers (numpy.ndarray): (n, 2) centers (origin if None)
+
+        Returns:
+            (n, vertices, 2) numpy.ndarray of rotated points
+    """
+    angle_rad = np.radians(np.asarray(angles, dtype=float) % 360)
+    cos, sin = np.cos(angle_rad), np.sin(angle_rad)
+    # One rotation matrix per angle
+    rotations = np.stack(
+        [np.stack([cos, -sin], axis=-1), np.stack([sin, cos], axis=-1)],
+        axis=-2)
+    rotated = np.einsum('nij,vj->nvi', rotations, points)
+    if centers is not None:
+        rotated += np.asarray(centers, dtype=float)[:, None, :]
+
+    return rotated
+
+
+def _build_gauges(kinds, values, x_domains, y_domains):
+    """
+        Build the traces, needle shapes and value annotations of many
+        gauges, computing every needle with a single rotation.
+
+        Args:
+            kinds (list): key of GAUGES of each gauge
+            values (list): value shown by each gauge
+            x_domains (numpy.ndarray): (n, 2) paper x domain of each gauge
+            y_domains (numpy.ndarray): (n, 2) paper y domain of each gauge
+
+        Returns:
+            list of traces, list of shapes and list of annotations
+    """
+    x_domains = np.asarray(x_domains, dtype=float)
+    y_domains = np.asarray(y_domains, dtype=float)
+    angles = np.array([GAUGES[kind]['angle'](value)
+                       for kind, value in zip(kinds, values)])
+    centers = np.stack([x_domains.mean(axis=1), y_domains.mean(axis=1)],
+                       axis=-1)
+    # Needles are rotated at the reference size, then scaled to each gauge
+    scales = np.stack([np.diff(x_domains, axis=1)[:, 0] / 0.48,
+                       np.diff(y_domains, axis=1)[:, 0]], axis=-1)
+    needles = (_rotate_points(NEEDLE, angles) * scales[:, None, :] +
+               centers[:, None, :])
+    data = []
+    shapes = []
+    annotations = []
+    for kind, value, x, y, needle in zip(
+            kinds, values, x_domains.tolist(), y_domains.tolist(),
+            needles.reshape(len(needles), NEEDLE.size).tolist()):
+        data.extend(deepcopy(_gauge_traces(kind, tuple(x), tuple(y))))
+        # Create shape
+        shapes.append({
+            **deepcopy(NEEDLE_SHAPE),
+            'path': 'M {} {} L {} {} L {} {} Z'.format(*needle)
+        })
+        # Create annotations
+        annotations.append({
+            **VALUE_ANNOTATION,
+            'x': (x[0] + x[1]) / 2,
+            'y': y[0] + 0.45 * (y[1] - y[0]),
+            'text': str(np.round(value, 3))
+        })
+
+    return data, shapes, annotations
+
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def _gauge_traces(kind, x, y):
     """
-    angle_rad = np.radians(angle % 360)
-    # Shift the point so that center_point becomes the origin
-    new_point = (point[0] - center_point[0], point[1] - center_point[1])
-    new_point = (
-        new_point[0] * np.cos(angle_rad) - new_point[1] * np.sin(angle_rad),
-        new_point[0] * np.sin(angle_rad) + new_point[1] * np.cos(angle_rad))
-    # Reverse the shifting we have done
-    new_point = (
-        new_point[0] + center_point[0], new_point[1] + center_point[1])
+        Build the dial and meter pie traces of a gauge, which only depend on
+        the kind of gauge and its position.
+
+        Args:
+            kind (str): key of GAUGES
+            x (tuple): paper x domain
+            y (tuple): paper y domain
+
+        Returns:
+            tuple of the two trace dicts (memoized, copy before modifying)
+    """
+    gauge = GAUGES[kind]
+    base_chart = {
+        "values": [40, 20, 20, 20],
+        "labels": gauge['guage_labels'],
+        "domain": {'x': list(x), 'y': list(y)},
+        "marker": {
+            "colors": gauge['colors'],
+            "line": {"width": 0}
+        },
+        "name": "Gauge",
+        "hole": .4,
+        "type": "pie",
+        "direction": "clockwise",
+        "rotation": 108,
+        "showlegend": False,
+        "hoverinfo": "none",
+        "textinfo": "label",
+        "textposition": "outside"
+    }
+
+    pos_fraction = 50 / 3
+
+    meter_chart = {
+        "values": [50, pos_fraction, pos_fraction, pos_fraction],
+        "labels": gauge['color_labels'],
+        "marker": {'colors': gauge['colors']},
+        "domain": {"x": list(x), 'y': list(y)},
+        "name": "Gauge",
+        "hole": .3,
+        "type": "pie",
+        "direction": "clockwise",
+        "rotation": 90,
+        "showlegend": False,
+        "textinfo": "label",
+        "textposition": "inside",
+        "hoverinfo": "none"
+    }
 
-    return new_point
+    return base_chart, meter_chart
+
+
+def _gauge_layout(shapes, annotations):
+    """
+        Build the layout of a gauge figure, hiding the axes.
+    """
+    return {
+        'xaxis': dict(HIDDEN_AXIS),
+        'yaxis': dict(HIDDEN_AXIS),
+        'shapes': shapes,
+        'annotations': annotations
+    }
 
 
 def create_sentiment_gauge(polarity, subjectivity):
@@ -92,162 +353,238 @@ def create_sentiment_gauge(polarity, subjectivity):
         This method will create a plotly formatted dict which will be displayed
         as a guage, and will show the general sentiment of the text from all
         the tweets.
-        TODO: Add subjectivity as second guage
 
         Args:
-            blob (textblob.TextBlob): TextBlob of all tweets
+            polarity (float): polarity shown on the left gauge
+            subjectivity (float): subjectivity shown on the right gauge
 
         Returns:
             figure dict object formatted for plotly
     """
-    # --- Initialize Gauge Chart Metrics ---
-    guage_data = {
-        'polarity': {
-            'value': polarity,
-            'x': [0.0, .48],
-            'guage_labels': ["-", "-1", "0", "1"],
-            'angle':  -80.0 * polarity,
-            'color_labels': ['Polarity', 'Negative', 'Neutral', 'Positive'],
-            'colors': [
-                'rgb(255, 255, 255)', # Black
-                'rgb(255, 102, 102)', # Light Red
-                'rgb(192, 192, 192)', # Grey
-                'rgb(178, 255, 102)' # Light Green
-            ]
-        },
-        'subjectivity': {
-            'value': subjectivity,
-            'x': [.52, 1.0],
-            'guage_labels': ["-", "0", "0.5", "1"],
-            'angle': -80.0 * ((subjectivity * 2) - 1),
-            'color_labels': ['Subjectivity', 'Very Objective', 'Neutral',
-                             'Very Subjective'],
-            'colors': [
-                'rgb(255, 255, 255)', # Black
-                'rgb(178, 255, 102)', # Light Green
-                'rgb(192, 192, 192)', # Grey
-                'rgb(255, 102, 102)' # Light Red
-            ]
-        }
-    }
-    # --- Initialize Layout ---
-    layout = {
-        'xaxis': {
-            'showticklabels': False,
-            'showgrid': False,
-            'zeroline': False
-        },
-        'yaxis': {
-            'showticklabels': False,
-            'showgrid': False,
-            'zeroline': False
-        },
-        'shapes': [],
-        'annotations': []
-    }
-    # Initialize data list
-    data = []
-    # Iterate over guage data and create each guage
-    for key, values in guage_data.items():
-        base_chart = {
-            "values": [40, 20, 20, 20],
-            "labels": values['guage_labels'],
-            "domain": {'x': values['x']},
-            "marker": {
-                "colors": values['colors'],
-                "line": {"width": 0}
-            },
-            "name": "Gauge",
-            "hole": .4,
-            "type": "pie",
-            "direction": "clockwise",
-            "rotation": 108,
-            "showlegend": False,
-            "hoverinfo": "none",
-            "textinfo": "label",
-            "textposition": "outside"
-        }
+    data, shapes, annotations = _build_gauges(
+        ['polarity', 'subjectivity'], [polarity, subjectivity],
+        [[0.0, .48], [.52, 1.0]], [[0.0, 1.0], [0.0, 1.0]])
+    # Create figure dict
+    fig = {"data": data, "layout": _gauge_layout(shapes, annotations)}
 
-        pos_fraction = 50 / 3
-
-        meter_chart = {
-            "values": [50, pos_fraction, pos_fraction, pos_fraction],
-            "labels": values['color_labels'],
-            "marker": {'colors': values['colors']},
-            "domain": {"x": values['x']},
-            "name": "Gauge",
-            "hole": .3,
-            "type": "pie",
-            "direction": "clockwise",
-            "rotation": 90,
-            "showlegend": False,
-            "textinfo": "label",
-            "textposition": "inside",
-            "hoverinfo": "none"
-        }
+    return fig
 
-        # Initialize coordinates
-        coords = np.array([
-            [values['x'][0] + 0.235, 0.5],
-            [values['x'][0] + 0.24, 0.65],
-            [values['x'][0] + 0.245, 0.5]])
-        pivot = [values['x'][0] + 0.24, 0.5]
-        # Rotate dial about centeroid
-        new_coords = np.array([
-            _rotate_point(coord, values['angle'], center_point=pivot)
-            for coord in coords])
-        # Create shape
-        shape = {
-            'type': 'path',
-            'path': 'M {} {} L {} {} L {} {} Z'.format(*new_coords.flatten()),
-            'fillcolor': 'rgba(44, 160, 101, 0.5)', # Fill triangle green
-            'line': {'width': 0.5},
-            'xref': 'paper',
-            'yref': 'paper'
-        }
-        # Create annotations
-        annotation = {
+
+def create_gauge_grid(tickers, polarities, subjectivities, columns=2,
+                      row_height=350):
+    """
+        This method will create a grid of sentiment gauges, a polarity and
+        subjectivity gauge for every ticker.
+
+        Args:
+            tickers (list): ticker symbols
+            polarities (list): polarity of each ticker
+            subjectivities (list): subjectivity of each ticker
+            columns (int): number of tickers per row
+            row_height (int): height of each row in pixels
+
+        Returns:
+            figure dict object formatted for plotly
+    """
+    n = len(tickers)
+    columns = max(1, min(columns, n))
+    rows = max(1, -(-n // columns))
+    cell = np.arange(n)
+    width = 1.0 / columns
+    height = 1.0 / rows
+    # Cells fill rows top down, the top of each cell is left for its title
+    left = (cell % columns) * width
+    bottom = 1.0 - (cell // columns + 1) * height
+    top = bottom + 0.85 * height
+    # Polarity on the left and subjectivity on the right half of each cell
+    x_domains = np.concatenate([
+        np.stack([left, left + 0.48 * width], axis=-1),
+        np.stack([left + 0.52 * width, left + width], axis=-1)])
+    y_domains = np.tile(np.stack([bottom, top], axis=-1), (2, 1))
+    values = np.concatenate([polarities, subjectivities])
+    data, shapes, annotations = _build_gauges(
+        ['polarity'] * n + ['subjectivity'] * n, values, x_domains,
+        y_domains)
+    for ticker, x, y in zip(tickers, left + width / 2, top):
+        annotations.append({
             'xref': 'paper',
             'yref': 'paper',
-            'x': (values['x'][0] + values['x'][1]) / 2,
-            'y': 0.45,
-            'text': str(np.round(values['value'], 3)),
+            'x': x,
+            'y': y + 0.05 * height,
+            'text': '<b>{}</b>'.format(ticker),
+            'font': {'size': 16},
             'showarrow': False
-        }
-        # Add objects to layout and data
-        layout['shapes'].append(shape)
-        layout['annotations'].append(annotation)
-        data.append(base_chart)
-        data.append(meter_chart)
-    # we don't want the boundary now
-    base_chart['marker']['line']['width'] = 0
-    # Create figure dict
+        })
+    layout = _gauge_layout(shapes, annotations)
+    layout['height'] = row_height * rows
+
     fig = {"data": data, "layout": layout}
 
     return fig
 
 
+# Above this many rows plots are built from pre-aggregated data (quartiles,
+# KDEs and bins computed here) and a sample of the points
+MAX_POINTS = 5000
+# Largest number of bins per axis of pre-binned histograms
+MAX_BINS = 100
+# Default plotly colorway, used to color pre-aggregated traces alike
+COLORS = ['#636efa', '#EF553B', '#00cc96', '#ab63fa', '#FFA15A',
+          '#19d3f3', '#FF6692', '#B6E880', '#FF97FF', '#FECB52']
+
+
+def _finite(values):
+    """
+        Cast values to a float array, dropping missing values.
+    """
+    values = np.asarray(values, dtype=float)
+
+    return values[np.isfinite(values)]
+
+
+def _sample(values, max_points, seed=0):
+    """
+        Uniformly sample at most max_points values without replacement,
+        keeping their order.
+    """
+    values = np.asarray(values)
+    if max_points is None or len(values) <= max_points:
+        return values
+    rng = np.random.default_rng(seed)
+    index = np.sort(rng.choice(len(values), max_points, replace=False))
+
+    return values[index]
+
+
+def _box_stats(values):
+    """
+        Compute the quartiles, whisker fences (1.5 IQR) and mean plotly draws
+        a box from.
+    """
+    values = _finite(values)
+    q1, median, q3 = np.percentile(values, [25, 50, 75])
+    iqr = q3 - q1
+
+    return {
+        'q1': [q1],
+        'median': [median],
+        'q3': [q3],
+        'lowerfence': [values[values >= q1 - 1.5 * iqr].min()],
+        'upperfence': [values[values <= q3 + 1.5 * iqr].max()],
+        'mean': [values.mean()]
+    }
+
+
+def _kde(values, n_points=200, bins=1024):
+    """
+        Estimate the density of values with a gaussian kernel (Silverman's
+        bandwidth, as plotly's violins use), binning the values first so
+        the cost is independent of the number of values.
+
+        Returns:
+            grid of values and their density
+    """
+    values = _finite(values)
+    n = len(values)
+    iqr = np.subtract(*np.percentile(values, [75, 25]))
+    spread = min(values.std(), iqr / 1.349) or values.std()
+    bandwidth = 1.059 * spread * n ** -0.2
+    if not bandwidth:
+        return np.array([values[0]]), np.array([1.0])
+    counts, edges = np.histogram(values, bins=bins)
+    centers = (edges[:-1] + edges[1:]) / 2
+    grid = np.linspace(
+        values.min() - 2 * bandwidth, values.max() + 2 * bandwidth, n_points)
+    kernel = np.exp(-0.5 * ((grid[:, None] - centers) / bandwidth) ** 2)
+    density = kernel @ counts / (n * bandwidth * np.sqrt(2 * np.pi))
+
+    return grid, density
+
+
+def _bin_edges(values, max_bins=MAX_BINS):
+    """
+        Get histogram bin edges of values, at most max_bins bins.
+    """
+    edges = np.histogram_bin_edges(values, bins='auto')
+    if len(edges) - 1 > max_bins:
+        edges = np.histogram_bin_edges(values, bins=max_bins)
+
+    return edges
+
+
+def _histogram(values, max_bins=MAX_BINS):
+    """
+        Bin values, returning bin centers and counts.
+    """
+    values = _finite(values)
+    counts, edges = np.histogram(values, bins=_bin_edges(values, max_bins))
+
+    return (edges[:-1] + edges[1:]) / 2, counts
+
+
+def _histogram2d(x, y, max_bins=MAX_BINS):
+    """
+        Bin pairs of values, returning bin centers of both axes and counts
+        indexed by (y, x) as plotly heatmaps expect.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    mask = np.isfinite(x) & np.isfinite(y)
+    x, y = x[mask], y[mask]
+    counts, x_edges, y_edges = np.histogram2d(
+        x, y, bins=[_bin_edges(x, max_bins), _bin_edges(y, max_bins)])
+
+    return ((x_edges[:-1] + x_edges[1:]) / 2,
+            (y_edges[:-1] + y_edges[1:]) / 2, counts.T)
+
+
 def create_boxplot(tweet_df, columns=['retweets', 'favorites'],
-                   title='Retweets and Favorites'):
+                   title='Retweets and Favorites', max_points=MAX_POINTS):
     """
-        This method will create boxplots for retweets and favorites.
+        This method will create boxplots for retweets and favorites.  Above
+        max_points rows the boxes are drawn from pre-computed quartiles and
+        only a sample of the points is shown.
 
         Args:
             tweet_df (pandas.DataFrame): top tweets
+            max_points (int): most points shown per box (None for all)
 
         Returns:
             figure dict object formatted for plotly
     """
     # Build trace objects
     traces = []
-    for header in columns:
+    for i, header in enumerate(columns):
+        if max_points is None or len(tweet_df) <= max_points:
+            traces.append(go.Box(
+                x=tweet_df[header].values,
+                name=header,
+                boxpoints='all',
+                jitter=0.5,
+                whiskerwidth=0.2,
+                line=dict(width=1),
+            ))
+            continue
+        color = COLORS[i % len(COLORS)]
         traces.append(go.Box(
-            x=tweet_df[header].values,
+            y=[header],
+            name=header,
+            orientation='h',
+            whiskerwidth=0.2,
+            line=dict(width=1, color=color),
+            **_box_stats(tweet_df[header].values)
+        ))
+        # Sampled points drawn over an invisible box at the same position
+        traces.append(go.Box(
+            x=_sample(tweet_df[header].values, max_points),
             name=header,
             boxpoints='all',
             jitter=0.5,
-            whiskerwidth=0.2,
-            line=dict(width=1),
+            hoveron='points',
+            fillcolor='rgba(0,0,0,0)',
+            line=dict(width=0, color='rgba(0,0,0,0)'),
+            marker=dict(color=color),
+            showlegend=False
         ))
     # Build layout
     layout = go.Layout(title=title)
@@ -271,6 +608,9 @@ def create_distplot(tweet_df, headers=['net_influence'],
         Returns:
             figure dict object formatted for plotly
     """
+    # figure_factory is slow to import, only load it when needed
+    import plotly.figure_factory as ff
+
     # Create list of histogram data arrays
     hist_data = [tweet_df[header].values for header in headers]
     # Create figure
@@ -319,26 +659,33 @@ def create_user_description_scatter(user_word_count, n=15):
     return fig
 
 
-def create_2d_histogram(df, xaxis, yaxis, title):
+def create_2d_histogram(df, xaxis, yaxis, title, max_points=MAX_POINTS):
     """
-        This method will create a 2d histogram (heatmap)
+        This method will create a 2d histogram (heatmap).  Above max_points
+        rows the data is binned here and drawn as a heatmap of counts.
 
         Args:
             df (pandas.DataFrame): data that will be displayed
             xaxis (str): x axis header
             yaxis (str): y axis header
             title (str): plot title
+            max_points (int): most rows sent to plotly unbinned (None for
+                all)
 
         Returns:
             figure dict object formatted for plotly
     """
     # Create data
-    data = [
-        go.Histogram2d(
-           x=df[xaxis],
-           y=df[yaxis]
-        )
-    ]
+    if max_points is None or len(df) <= max_points:
+        data = [
+            go.Histogram2d(
+               x=df[xaxis],
+               y=df[yaxis]
+            )
+        ]
+    else:
+        x, y, counts = _histogram2d(df[xaxis].values, df[yaxis].values)
+        data = [go.Heatmap(x=x, y=y, z=counts)]
     # Create layout
     layout = {
         'title': title,
@@ -351,40 +698,96 @@ def create_2d_histogram(df, xaxis, yaxis, title):
     return fig
 
 
-def create_violin_plot(df, columns, title):
+def create_violin_plot(df, columns, title, max_points=MAX_POINTS):
     """
         This method will create violin plots given a DataFrame and columns.
+        Above max_points rows the violins are drawn from pre-computed KDEs
+        and quartiles and only a sample of the points is shown.
 
         Args:
             df (pandas.DataFrame): data that will be displayed
             columns (list): list of columns
             title (str): violin plot title
+            max_points (int): most points shown per violin (None for all)
 
         Returns:
             figure dict object formatted for plotly
     """
-    # Create trace data
-    data = []
-    for c in columns:
-        data.append(
-            {
-                "type": 'violin',
-                "y": df[c],
-                #"line": {"color": 'black'},
-                "box": {"visible": True},
-                "meanline": {"visible": True},
-                #"fillcolor": '#8dd3c7',
-                "opacity": 0.6,
-                "name": c,
-                "points": 'all',
-                "jitter": 0
-            }
-        )
     # Create layout
     layout = {
-        "title": title,
+        "title": {"text": title},
         "yaxis": {"zeroline": False}
     }
+    # Create trace data
+    data = []
+    if max_points is None or len(df) <= max_points:
+        for c in columns:
+            data.append(
+                {
+                    "type": 'violin',
+                    "y": df[c],
+                    #"line": {"color": 'black'},
+                    "box": {"visible": True},
+                    "meanline": {"visible": True},
+                    #"fillcolor": '#8dd3c7',
+                    "opacity": 0.6,
+                    "name": c,
+                    "points": 'all',
+                    "jitter": 0
+                }
+            )
+    else:
+        for i, c in enumerate(columns):
+            color = COLORS[i % len(COLORS)]
+            grid, density = _kde(df[c].values)
+            # Mirror the density around the violin's position
+            half_width = 0.45 * density / density.max()
+            data.append(
+                {
+                    "type": 'scatter',
+                    "x": np.concatenate(
+                        [i - half_width, (i + half_width)[::-1]]),
+                    "y": np.concatenate([grid, grid[::-1]]),
+                    "mode": 'lines',
+                    "fill": 'toself',
+                    "line": {"color": color},
+                    "opacity": 0.6,
+                    "name": c,
+                    "legendgroup": c,
+                    "hoverinfo": 'skip'
+                }
+            )
+            data.append(
+                dict(
+                    type='box',
+                    x=[i],
+                    width=0.1,
+                    boxmean=True,
+                    line={"color": color},
+                    name=c,
+                    legendgroup=c,
+                    showlegend=False,
+                    **_box_stats(df[c].values)
+                )
+            )
+            sample = _sample(df[c].values, max_points)
+            data.append(
+                {
+                    "type": 'scatter',
+                    "x": np.full(len(sample), i),
+                    "y": sample,
+                    "mode": 'markers',
+                    "marker": {"color": color, "size": 3},
+                    "name": c,
+                    "legendgroup": c,
+                    "showlegend": False
+                }
+            )
+        layout["xaxis"] = {
+            "tickvals": list(range(len(columns))),
+            "ticktext": list(columns),
+            "zeroline": False
+        }
 
     fig = {'data': data, 'layout': layout}
 
@@ -392,36 +795,21 @@ def create_violin_plot(df, columns, title):
     return fig
 
 
-def create_contour(
-    df, title='Retweets vs. Polarity', yaxis='polarity',
-    xaxes=['retweets'], colors=['Blues'],
-    domains=[[[.0, .85], [.0, .85], [.85, 1.0], [.85, 1.0]]]):
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def _contour_template(title, yaxis, xaxes, colors, domains):
     """
-        This method will create contour plots for given groups of paired data.
-
-        TODO: Figure out how to get multiple plots to work
-        #colors = ['Blues', 'Reds', 'Greens']
-        #domains = [
-        #    [[.0, .45], [.5, .95], [.45, 0.5], [.95, 1.0]],
-        #    [[.5, .95], [.5, .95], [.95, 1.0], [.95, 1.0]],
-        #    [[.0, .95], [.0, .45], [.95, 1.0], [.45, 0.5]]
-        #]
-
-        Args:
-            df (pandas.DataFrame): data
-            yaxis (str): yaxis value
-            xaxis (list): xaxis values
-            domains (list): list of domain values for each trace
-            colors (list): list of color scales
+        Build the layout and the static keys of the traces of a contour
+        figure.  Arguments are tuples so they can be memoized.
 
         Returns:
-            figure dict object formatted for plotly
+            layout dict and a (contour, y histogram, x histogram) tuple of
+            trace dicts for every x axis
     """
     # Initialize data and layout lists
-    data = []
+    traces = []
     layout = {
         'showlegend': False,
-        'title': title,
+        'title': {'text': title},
         'bargap': 0,
         'hovermode': 'closest'}
     for i in range(len(xaxes)):
@@ -457,55 +845,102 @@ def create_contour(
                 'layout': 'yaxis' + str(i*2+2)
             }
         }
-        # Append trace values
-        data.append(
-            go.Histogram2dContour(
-                x=df[xaxes[i]],
-                y=df[yaxis],
-                xaxis=axis1_args['xaxis']['trace'],
-                yaxis=axis1_args['yaxis']['trace'],
-                colorscale=colors[i],
-                reversescale = True
-            )
-        )
-        data.append(
-            go.Histogram(
-                y=df[yaxis],
-                xaxis=axis2_args['xaxis']['trace'],
-                marker = {'color': 'rgba(0,0,0,1)'}
-            )
-        )
-        data.append(
-            go.Histogram(
-                x=df[xaxes[i]],
-                yaxis=axis2_args['yaxis']['trace'],
-                marker = {'color': 'rgba(0,0,0,1)'}
-            )
-        )
+        # Static trace keys, data is patched in by create_contour
+        traces.append((
+            {
+                'xaxis': axis1_args['xaxis']['trace'],
+                'yaxis': axis1_args['yaxis']['trace'],
+                'colorscale': colors[i],
+                'reversescale': True
+            },
+            {
+                'xaxis': axis2_args['xaxis']['trace'],
+                'marker': {'color': 'rgba(0,0,0,1)'}
+            },
+            {
+                'yaxis': axis2_args['yaxis']['trace'],
+                'marker': {'color': 'rgba(0,0,0,1)'}
+            }
+        ))
         # Add layout keys
         layout[axis1_args['xaxis']['layout']] = dict(
             zeroline = False,
-            domain = domains[i][0],
+            domain = list(domains[i][0]),
             showgrid = False,
-            title=xaxes[i]
+            title={'text': xaxes[i]}
         )
         layout[axis1_args['yaxis']['layout']] = dict(
             zeroline = False,
-            domain = domains[i][1],
+            domain = list(domains[i][1]),
             showgrid = False,
-            title=yaxis
+            title={'text': yaxis}
         )
         layout[axis2_args['xaxis']['layout']] = dict(
             zeroline = False,
-            domain = domains[i][2],
+            domain = list(domains[i][2]),
             showgrid = False,
         )
         layout[axis2_args['yaxis']['layout']] = dict(
             zeroline = False,
-            domain = domains[i][3],
+            domain = list(domains[i][3]),
             showgrid = False,
         )
 
+    return layout, tuple(traces)
+
+
+def create_contour(
+    df, title='Retweets vs. Polarity', yaxis='polarity',
+    xaxes=['retweets'], colors=['Blues'],
+    domains=[[[.0, .85], [.0, .85], [.85, 1.0], [.85, 1.0]]],
+    max_points=MAX_POINTS):
+    """
+        This method will create contour plots for given groups of paired data.
+        Above max_points rows the data is binned here and drawn as contours
+        and bars of counts.
+
+        TODO: Figure out how to get multiple plots to work
+        #colors = ['Blues', 'Reds', 'Greens']
+        #domains = [
+        #    [[.0, .45], [.5, .95], [.45, 0.5], [.95, 1.0]],
+        #    [[.5, .95], [.5, .95], [.95, 1.0], [.95, 1.0]],
+        #    [[.0, .95], [.0, .45], [.95, 1.0], [.45, 0.5]]
+        #]
+
+        Args:
+            df (pandas.DataFrame): data
+            yaxis (str): yaxis value
+            xaxis (list): xaxis values
+            domains (list): list of domain values for each trace
+            colors (list): list of color scales
+            max_points (int): most rows sent to plotly unbinned (None for
+                all)
+
+        Returns:
+            figure dict object formatted for plotly
+    """
+    layout, traces = deepcopy(_contour_template(
+        title, yaxis, tuple(xaxes), tuple(colors),
+        tuple(tuple(map(tuple, d)) for d in domains)))
+    aggregate = max_points is not None and len(df) > max_points
+    data = []
+    for xaxis, (contour, y_hist, x_hist) in zip(xaxes, traces):
+        # Append trace values
+        if not aggregate:
+            data.append({**contour, 'type': 'histogram2dcontour',
+                         'x': df[xaxis], 'y': df[yaxis]})
+            data.append({**y_hist, 'type': 'histogram', 'y': df[yaxis]})
+            data.append({**x_hist, 'type': 'histogram', 'x': df[xaxis]})
+        else:
+            x, y, counts = _histogram2d(df[xaxis].values, df[yaxis].values)
+            data.append({**contour, 'type': 'contour',
+                         'x': x, 'y': y, 'z': counts})
+            centers, counts = _histogram(df[yaxis].values)
+            data.append({**y_hist, 'type': 'bar', 'orientation': 'h',
+                         'x': counts, 'y': centers})
+            centers, counts = _histogram(df[xaxis].values)
+            data.append({**x_hist, 'type': 'bar', 'x': centers, 'y': counts})
+
     fig = {'data': data, 'layout': layout}
 
     return fig
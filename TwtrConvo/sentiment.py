@@ -0,0 +1,192 @@
+"""
+This module will be responsible for scoring the sentiment of tweet text.
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import numpy as np
+from multiprocessing import Pool
+
+
+class SentimentCache(object):
+    """
+        Persistent, size bounded cache of sentiment scores stored in SQLite.
+        Scores are keyed by a hash of the cleaned text, and the least
+        recently used entries are evicted once max_entries is exceeded.
+
+        Args:
+            path (str): path to the SQLite database file
+            max_entries (int): maximum number of cached scores
+    """
+
+    # SQLite limits the number of bound parameters per statement
+    _BATCH_SIZE = 500
+
+    def __init__(self, path, max_entries=1000000):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        # Wait on locks held by other processes sharing the cache
+        self._conn = sqlite3.connect(path, timeout=60)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS sentiment ('
+            'key BLOB PRIMARY KEY, polarity REAL, subjectivity REAL, '
+            'last_used REAL)')
+        self._conn.execute(
+            'CREATE INDEX IF NOT EXISTS sentiment_last_used '
+            'ON sentiment (last_used)')
+        self._conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self._conn.execute(
+            'SELECT COUNT(*) FROM sentiment').fetchone()[0]
+
+    @staticmethod
+    def _key(text):
+        return hashlib.sha1(text.encode('utf-8')).digest()
+
+    def get_many(self, texts):
+        """
+            Look up cached scores for a list of texts.
+
+            Args:
+                texts (list): list of cleaned text strings
+
+            Returns:
+                dict mapping each cached text to (polarity, subjectivity)
+        """
+        keys = {self._key(t): t for t in texts}
+        key_list = list(keys)
+        scores = {}
+        for i in range(0, len(key_list), self._BATCH_SIZE):
+            batch = key_list[i:i + self._BATCH_SIZE]
+            rows = self._conn.execute(
+                'SELECT key, polarity, subjectivity FROM sentiment '
+                'WHERE key IN ({})'.format(','.join('?' * len(batch))),
+                batch).fetchall()
+            for key, polarity, subjectivity in rows:
+                scores[keys[key]] = (polarity, subjectivity)
+        # Mark hits as recently used
+        now = time.time()
+        self._conn.executemany(
+            'UPDATE sentiment SET last_used = ? WHERE key = ?',
+            [(now, self._key(t)) for t in scores])
+        self._conn.commit()
+        self.hits += len(scores)
+        self.misses += len(keys) - len(scores)
+
+        return scores
+
+    def set_many(self, items):
+        """
+            Store scores in the cache, evicting the least recently used
+            entries if the cache grows past max_entries.
+
+            Args:
+                items (iterable): (text, (polarity, subjectivity)) pairs
+
+            Returns:
+                None
+        """
+        now = time.time()
+        self._conn.executemany(
+            'INSERT OR REPLACE INTO sentiment VALUES (?, ?, ?, ?)',
+            [(self._key(t), p, s, now) for t, (p, s) in items])
+        overflow = len(self) - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                'DELETE FROM sentiment WHERE key IN ('
+                'SELECT key FROM sentiment ORDER BY last_used LIMIT ?)',
+                (overflow,))
+        self._conn.commit()
+
+        return
+
+    def stats(self):
+        """
+            Get the hit rate statistics of the cache.
+
+            Returns:
+                dict of hits, misses, hit_rate and entries
+        """
+        lookups = self.hits + self.misses
+
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': len(self)
+        }
+
+    def close(self):
+        self._conn.close()
+
+
+def _score_chunk(texts):
+    """
+        Score a chunk of texts, evaluating each TextBlob sentiment once.
+
+        Args:
+            texts (list): list of cleaned text strings
+
+        Returns:
+            list of (polarity, subjectivity) tuples
+    """
+    from textblob import TextBlob
+
+    scores = []
+    for text in texts:
+        sentiment = TextBlob(text).sentiment
+        scores.append((sentiment.polarity, sentiment.subjectivity))
+
+    return scores
+
+
+def get_sentiment(texts, processes=1, chunksize=1000, cache=None):
+    """
+        This method will score the sentiment of a batch of texts.  Each
+        distinct text is scored once, texts found in the cache are skipped
+        and the rest are split into chunks which are scored across a process
+        pool.  Results are returned in the same order as the input texts.
+
+        Args:
+            texts (list): list of cleaned text strings
+            processes (int): number of worker processes (None for all cores)
+            chunksize (int): number of texts scored per task
+            cache (SentimentCache): optional persistent score cache
+
+        Returns:
+            polarity and subjectivity numpy.ndarrays
+    """
+    texts = list(texts)
+    unique = list(dict.fromkeys(texts))
+    scores = cache.get_many(unique) if cache is not None else {}
+    missing = [t for t in unique if t not in scores]
+    if processes is None:
+        processes = os.cpu_count() or 1
+    chunks = [
+        missing[i:i + chunksize] for i in range(0, len(missing), chunksize)]
+    # Only spin up a pool if there is more than one chunk to score
+    if processes > 1 and len(chunks) > 1:
+        with Pool(min(processes, len(chunks))) as pool:
+            # Pool.map preserves the order of the chunks
+            results = pool.map(_score_chunk, chunks)
+    else:
+        results = [_score_chunk(chunk) for chunk in chunks]
+    new_scores = [score for chunk in results for score in chunk]
+    scores.update(zip(missing, new_scores))
+    if cache is not None and missing:
+        cache.set_many(zip(missing, new_scores))
+    scores = np.array(
+        [scores[t] for t in texts], dtype=np.float64).reshape(-1, 2)
+
+    return scores[:, 0], scores[:, 1]
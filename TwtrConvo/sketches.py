@@ -0,0 +1,287 @@
+"""
+This module will provide approximate, fixed memory counting of items (e.g.
+ngrams) in unbounded streams.
+
+SpaceSaving keeps the top items of a stream in a fixed number of counters.
+With m counters over a stream of N items, every item with a true count above
+N / m is kept, and each kept count overestimates the true count by at most
+its recorded error, which is at most N / m.
+
+CountMinSketch estimates the count of any item in a fixed size table.  With
+width w = ceil(e / epsilon) and depth d = ceil(ln(1 / delta)), an estimate
+overestimates the true count by at most epsilon * N with probability at least
+1 - delta, and never underestimates it.
+
+Both are mergeable, sketches of different shards or days can be combined and
+the bounds hold over the combined stream.
+"""
+
+import math
+import heapq
+import hashlib
+import numpy as np
+
+
+class SpaceSaving(object):
+    """
+        Space-Saving heavy hitter summary.  Exposes most_common like a
+        collections.Counter so it can be used in place of one.
+
+        Args:
+            capacity (int): number of counters kept
+    """
+
+    def __init__(self, capacity=10000):
+        self.capacity = capacity
+        self.n = 0
+        self.counts = {}
+        self.errors = {}
+        # Min heap of (count, item), counts may be stale (too low)
+        self._heap = []
+
+    def __len__(self):
+        return len(self.counts)
+
+    def __contains__(self, item):
+        return item in self.counts
+
+    def __getitem__(self, item):
+        return self.counts.get(item, 0)
+
+    def _pop_min(self):
+        # Refresh stale heap entries until the top is the true minimum
+        while True:
+            count, item = self._heap[0]
+            if self.counts[item] == count:
+                return heapq.heappop(self._heap)
+            heapq.heapreplace(self._heap, (self.counts[item], item))
+
+    def add(self, item, count=1):
+        """
+            Count an item.
+
+            Args:
+                item (hashable): item
+                count (int): number of occurrences
+
+            Returns:
+                None
+        """
+        self.n += count
+        if item in self.counts:
+            self.counts[item] += count
+        elif len(self.counts) < self.capacity:
+            self.counts[item] = count
+            self.errors[item] = 0
+            heapq.heappush(self._heap, (count, item))
+        else:
+            # Replace the item with the smallest count, the new item may
+            # have occurred up to that many times before
+            min_count, min_item = self._pop_min()
+            del self.counts[min_item]
+            del self.errors[min_item]
+            self.counts[item] = min_count + count
+            self.errors[item] = min_count
+            heapq.heappush(self._heap, (min_count + count, item))
+
+        return
+
+    def update(self, items):
+        """
+            Count an iterable of items or a mapping of item counts.
+
+            Args:
+                items (iterable or dict): items
+
+            Returns:
+                None
+        """
+        if hasattr(items, 'items'):
+            for item, count in items.items():
+                self.add(item, count)
+        else:
+            for item in items:
+                self.add(item)
+
+        return
+
+    def min_count(self):
+        """
+            Get the smallest kept count, the most any item that is not kept
+            can have occurred (0 if the summary is not full).
+        """
+        if len(self.counts) < self.capacity:
+            return 0
+
+        return min(self.counts.values())
+
+    def most_common(self, k=None):
+        """
+            Get the top k items and their (over)estimated counts.
+
+            Args:
+                k (int): number of items (all kept items if None)
+
+            Returns:
+                list of (item, count) tuples, largest first
+        """
+        if k is None:
+            return sorted(
+                self.counts.items(), key=lambda x: x[1], reverse=True)
+
+        return heapq.nlargest(k, self.counts.items(), key=lambda x: x[1])
+
+    def guaranteed(self, k=None):
+        """
+            Get the items guaranteed to be among the true top k, those whose
+            lower bound count is at least the (k + 1)-th largest estimate
+            (no other item can have occurred more often), along with the
+            lower bounds of their counts.
+
+            Args:
+                k (int): number of items (all kept items if None)
+
+            Returns:
+                list of (item, lower bound count) tuples, largest estimate
+                first
+        """
+        if k is None:
+            k = len(self.counts)
+        top = self.most_common(k + 1)
+        # Items past the k-th, kept or not, occurred at most this often
+        threshold = top[k][1] if len(top) > k else self.min_count()
+
+        return [(item, count - self.errors[item])
+                for item, count in top[:k]
+                if count - self.errors[item] >= threshold]
+
+    def merge(self, other):
+        """
+            Merge another summary into a new summary.  Items missing from a
+            full summary are counted as its smallest count (the most they
+            could have occurred).
+
+            Args:
+                other (SpaceSaving): summary of another stream
+
+            Returns:
+                merged SpaceSaving
+        """
+        merged = SpaceSaving(max(self.capacity, other.capacity))
+        min_self = self.min_count()
+        min_other = other.min_count()
+        counts = {}
+        errors = {}
+        for item in set(self.counts) | set(other.counts):
+            counts[item] = (self.counts.get(item, min_self) +
+                            other.counts.get(item, min_other))
+            errors[item] = (self.errors.get(item, min_self) +
+                            other.errors.get(item, min_other))
+        top = heapq.nlargest(
+            merged.capacity, counts.items(), key=lambda x: x[1])
+        merged.counts = dict(top)
+        merged.errors = {item: errors[item] for item, _ in top}
+        merged._heap = [(count, item) for item, count in top]
+        heapq.heapify(merged._heap)
+        merged.n = self.n + other.n
+
+        return merged
+
+
+class CountMinSketch(object):
+    """
+        Count-Min sketch of item counts.  Items are hashed with a stable
+        hash so sketches built in different processes can be merged.
+
+        Args:
+            width (int): number of counters per row
+            depth (int): number of rows (hash functions)
+    """
+
+    def __init__(self, width=2719, depth=5):
+        self.width = width
+        self.depth = depth
+        self.n = 0
+        self.table = np.zeros((depth, width), dtype=np.int64)
+
+    @classmethod
+    def from_error(cls, epsilon=0.001, delta=0.01):
+        """
+            Create a sketch that overestimates counts by at most epsilon * N
+            with probability at least 1 - delta.
+        """
+        return cls(width=int(math.ceil(math.e / epsilon)),
+                   depth=int(math.ceil(math.log(1 / delta))))
+
+    def _columns(self, item):
+        if isinstance(item, tuple):
+            item = ' '.join(item)
+        digest = hashlib.blake2b(
+            str(item).encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        # Derive one hash per row from two hashes
+        return [(h1 + i * h2) % self.width for i in range(self.depth)]
+
+    def add(self, item, count=1):
+        """
+            Count an item.
+
+            Args:
+                item (hashable): item (strings or tuples of strings)
+                count (int): number of occurrences
+
+            Returns:
+                None
+        """
+        self.n += count
+        self.table[np.arange(self.depth), self._columns(item)] += count
+
+        return
+
+    def update(self, items):
+        """
+            Count an iterable of items or a mapping of item counts.
+
+            Args:
+                items (iterable or dict): items
+
+            Returns:
+                None
+        """
+        if hasattr(items, 'items'):
+            items, counts = zip(*items.items()) if items else ((), ())
+        else:
+            items = list(items)
+            counts = [1] * len(items)
+        if not items:
+            return
+        columns = np.array([self._columns(item) for item in items])
+        rows = np.broadcast_to(np.arange(self.depth), columns.shape)
+        counts = np.broadcast_to(
+            np.asarray(counts, dtype=np.int64)[:, None], columns.shape)
+        np.add.at(self.table, (rows, columns), counts)
+        self.n += int(counts[:, 0].sum())
+
+        return
+
+    def __getitem__(self, item):
+        return int(self.table[np.arange(self.depth), self._columns(item)].min())
+
+    def merge(self, other):
+        """
+            Merge another sketch of the same shape into a new sketch.
+
+            Args:
+                other (CountMinSketch): sketch of another stream
+
+            Returns:
+                merged CountMinSketch
+        """
+        if (self.width, self.depth) != (other.width, other.depth):
+            raise ValueError('Only sketches of the same shape can be merged')
+        merged = CountMinSketch(self.width, self.depth)
+        merged.table = self.table + other.table
+        merged.n = self.n + other.n
+
+        return merged
@@ -0,0 +1,225 @@
+"""
+This module will provide the sources tweets can be collected from, the live
+twitter search api, recorded tweet dumps and synthetic tweets.
+"""
+
+import json
+import time
+import random
+from collections import deque
+from datetime import datetime, timedelta, timezone
+
+# Format of the created_at field of the twitter api
+TWITTER_TIME_FORMAT = '%a %b %d %H:%M:%S +0000 %Y'
+
+
+def _throttle(tweets, rate):
+    """
+        Yield tweets at no more than rate tweets per second.
+
+        Args:
+            tweets (iterable): tweets
+            rate (float): tweets per second (no limit if None)
+
+        Returns:
+            generator of tweets
+    """
+    if not rate:
+        yield from tweets
+        return
+    start = time.perf_counter()
+    for i, tweet in enumerate(tweets):
+        delay = start + i / rate - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        yield tweet
+
+
+class TweetSource(object):
+    """
+        Base class of tweet sources.  A source is an iterable of raw tweet
+        dicts in the json format of the twitter api.
+    """
+
+    def __iter__(self):
+        raise NotImplementedError
+
+
+class SearchTweetSource(TweetSource):
+    """
+        Live tweets from the twitter search api.
+
+        Args:
+            ticker (str): stock / crypto ticker symbol
+            max_tweets (int): number of latest tweets to pull
+            since_id (int): only pull tweets newer than this id
+    """
+
+    def __init__(self, ticker, max_tweets=2500, since_id=None):
+        # Add $ to beginning of string if not already $
+        if ticker[0] != '$':
+            ticker = '$' + ticker
+        self.ticker = ticker
+        self.max_tweets = max_tweets
+        self.since_id = since_id
+
+    def __iter__(self):
+        import tweepy
+        from .tweets import get_api
+
+        kwargs = {'q': self.ticker, 'tweet_mode': 'extended'}
+        if self.since_id:
+            kwargs['since_id'] = self.since_id
+        cursor = tweepy.Cursor(get_api().search, **kwargs)
+        for status in cursor.items(self.max_tweets):
+            yield status._json
+
+
+class FileTweetSource(TweetSource):
+    """
+        Replays recorded tweets from a json file (list of tweets) or a json
+        lines file (one tweet per line).
+
+        Args:
+            path (str): path to the tweet dump
+            rate (float): tweets per second to replay at (no limit if None)
+            loop (bool): replay the file forever
+    """
+
+    def __init__(self, path, rate=None, loop=False):
+        self.path = path
+        self.rate = rate
+        self.loop = loop
+
+    def _read(self):
+        with open(self.path) as f:
+            first = f.read(1)
+            while first.isspace():
+                first = f.read(1)
+            f.seek(0)
+            # A json array, otherwise json lines
+            if first == '[':
+                yield from json.load(f)
+            else:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+
+    def _tweets(self):
+        while True:
+            yield from self._read()
+            if not self.loop:
+                return
+
+    def __iter__(self):
+        return _throttle(self._tweets(), self.rate)
+
+
+class SyntheticTweetSource(TweetSource):
+    """
+        Generates realistic synthetic tweets about a ticker, including
+        replies and retweets, for load testing without network access.
+
+        Args:
+            ticker (str): stock / crypto ticker symbol
+            n (int): number of tweets to generate (forever if None)
+            n_users (int): number of distinct users
+            reply_fraction (float): fraction of tweets that are replies
+            retweet_fraction (float): fraction of tweets that are retweets
+            start (datetime): created_at of the first tweet
+            interval (float): mean seconds between tweets
+            rate (float): tweets per second to emit at (no limit if None)
+            seed (int): random seed
+    """
+
+    WORDS = [
+        'stock', 'shares', 'market', 'earnings', 'calls', 'puts', 'long',
+        'short', 'buy', 'sell', 'hold', 'moon', 'crash', 'rally', 'dip',
+        'great', 'good', 'amazing', 'strong', 'happy', 'bullish', 'bad',
+        'terrible', 'weak', 'awful', 'bearish', 'today', 'week', 'price',
+        'target', 'chart', 'volume', 'news', 'ceo', 'quarter', 'guidance',
+        'record', 'deliveries', 'revenue', 'growth', 'the', 'is', 'a', 'to',
+        'and', 'this', 'it', 'of', 'for', 'on', 'will', 'just', 'not']
+    DESCRIPTION_WORDS = [
+        'trader', 'investor', 'options', 'daytrader', 'analyst', 'crypto',
+        'tech', 'engineer', 'founder', 'dad', 'mom', 'news', 'finance',
+        'stocks', 'charts', 'not', 'financial', 'advice', 'bot', 'alerts']
+
+    def __init__(self, ticker, n=1000, n_users=None, reply_fraction=0.2,
+                 retweet_fraction=0.3, start=None, interval=1.0, rate=None,
+                 seed=0):
+        self.ticker = ticker.lstrip('$').upper()
+        self.n = n
+        self.n_users = n_users or max(1, (n or 100000) // 4)
+        self.reply_fraction = reply_fraction
+        self.retweet_fraction = retweet_fraction
+        self.start = start or datetime(2019, 1, 1, tzinfo=timezone.utc)
+        self.interval = interval
+        self.rate = rate
+        self.seed = seed
+
+    def _user(self, user_id):
+        # Seed each user by id so the same user is always the same
+        user_rng = random.Random(self.seed * 1000003 + user_id)
+        return {
+            'id': user_id,
+            'id_str': str(user_id),
+            'screen_name': 'user{}'.format(user_id),
+            'description': ' '.join(user_rng.choice(self.DESCRIPTION_WORDS)
+                                    for _ in range(user_rng.randint(0, 8))),
+            'followers_count': int(user_rng.lognormvariate(5, 2)),
+            'friends_count': int(user_rng.lognormvariate(5, 1.5)),
+            'favourites_count': int(user_rng.lognormvariate(6, 2)),
+            'statuses_count': int(user_rng.lognormvariate(7, 2))
+        }
+
+    def _text(self, rng):
+        words = [rng.choice(self.WORDS) for _ in range(rng.randint(4, 30))]
+        words.insert(rng.randrange(len(words)), '$' + self.ticker)
+        if rng.random() < 0.3:
+            words.append('https://t.co/{:010x}'.format(rng.getrandbits(40)))
+        if rng.random() < 0.2:
+            words.insert(0, '@user{}'.format(rng.randint(1, self.n_users)))
+        return ' '.join(words)
+
+    def _tweets(self):
+        rng = random.Random(self.seed)
+        created_at = self.start
+        tweet_id = 1000000000000000000
+        # Recent original tweets that replies are made to
+        recent = deque(maxlen=100)
+        i = 0
+        while self.n is None or i < self.n:
+            tweet_id += rng.randint(1, 1000000)
+            created_at += timedelta(seconds=rng.expovariate(1 / self.interval))
+            user = self._user(rng.randint(1, self.n_users))
+            kind = rng.random()
+            tweet = {
+                'id': tweet_id,
+                'id_str': str(tweet_id),
+                'created_at': created_at.strftime(TWITTER_TIME_FORMAT),
+                'full_text': self._text(rng),
+                'retweeted': False,
+                'in_reply_to_status_id': None,
+                'in_reply_to_user_id': None,
+                'favorite_count': int(rng.expovariate(1 / 5.0)),
+                'retweet_count': int(rng.expovariate(1 / 2.0)),
+                'user': user
+            }
+            if kind < self.retweet_fraction:
+                tweet['full_text'] = 'RT @user{}: {}'.format(
+                    rng.randint(1, self.n_users), tweet['full_text'])
+                tweet['favorite_count'] = 0
+            elif (kind < self.retweet_fraction + self.reply_fraction and
+                  recent):
+                # Reply to a recent original tweet
+                reply_id, reply_user_id = rng.choice(recent)
+                tweet['in_reply_to_status_id'] = reply_id
+                tweet['in_reply_to_user_id'] = reply_user_id
+            else:
+                recent.append((tweet_id, user['id']))
+            i += 1
+            yield tweet
+
+    def __iter__(self):
+        return _throttle(self._tweets(), self.rate)
@@ -0,0 +1,420 @@
+"""
+This module will be responsible for saving and loading datasets in columnar
+binary formats (Parquet or Arrow IPC / Feather), with CSV kept as an export
+format.  The binary formats require pyarrow.
+"""
+
+import os
+import time
+import datetime
+import pandas as pd
+
+# File extension of each storage format
+FORMATS = {
+    'parquet': '.parquet',
+    'feather': '.feather',
+    'csv': '.csv'
+}
+
+# Explicit column types of each table
+_COMMON_SCHEMA = [
+    ('index', 'int64'),
+    ('id', 'int64'),
+    ('username', 'string'),
+    ('user_id', 'int64'),
+    ('tweet', 'string'),
+    ('text', 'string'),
+    ('favorites', 'int64'),
+    ('retweets', 'int64'),
+    ('followers', 'int64'),
+    ('following', 'int64'),
+    ('polarity', 'float64'),
+    ('subjectivity', 'float64'),
+    ('created_at', 'timestamp')
+]
+SCHEMAS = {
+    'tweets': _COMMON_SCHEMA + [
+        ('net_influence', 'int64'),
+        ('net_influencerank', 'float64'),
+        ('retweetsrank', 'float64'),
+        ('favoritesrank', 'float64'),
+        ('rank', 'float64')
+    ],
+    'replies': _COMMON_SCHEMA + [
+        ('reply_id', 'int64'),
+        ('net_influence', 'int64')
+    ],
+    'users': [
+        ('username', 'string'),
+        ('user_id', 'int64'),
+        ('full_description', 'string'),
+        ('followers', 'int64'),
+        ('following', 'int64'),
+        ('favorites', 'int64'),
+        ('tweet_count', 'int64'),
+        ('description', 'string'),
+        ('net_influence', 'int64'),
+        # Only kept in the history store
+        ('created_at', 'timestamp')
+    ]
+}
+TABLES = ['tweets', 'replies', 'users']
+
+
+def get_arrow_schema(table, columns=None):
+    """
+        This method will build the pyarrow schema of a table.
+
+        Args:
+            table (str): table name (tweets, replies or users)
+            columns (list): columns to include (all if None)
+
+        Returns:
+            pyarrow.Schema
+    """
+    import pyarrow as pa
+
+    types = {'int64': pa.int64(), 'float64': pa.float64(),
+             'string': pa.string(), 'timestamp': pa.timestamp('ns', 'UTC')}
+
+    return pa.schema([
+        (name, types[dtype]) for name, dtype in SCHEMAS[table]
+        if columns is None or name in columns])
+
+
+def get_format(data_path):
+    """
+        This method will detect the format a dataset was saved in, preferring
+        the binary formats.
+
+        Args:
+            data_path (str): path to dataset
+
+        Returns:
+            format name (None if no dataset is saved)
+    """
+    for fmt, ext in FORMATS.items():
+        if os.path.exists(os.path.join(data_path, 'tweets' + ext)):
+            return fmt
+
+    return None
+
+
+def save_table(df, path, table, fmt='parquet'):
+    """
+        This method will save a single table.
+
+        Args:
+            df (pandas.DataFrame): table data
+            path (str): file path
+            table (str): table name (tweets, replies or users)
+            fmt (str): parquet, feather or csv
+
+        Returns:
+            None
+    """
+    if fmt == 'csv':
+        df.to_csv(path, index=False)
+        return
+    import pyarrow as pa
+
+    schema = get_arrow_schema(table, columns=df.columns)
+    # Columns not in the schema are kept with their inferred type
+    extra = [c for c in df.columns if c not in schema.names]
+    arrow_table = pa.Table.from_pandas(
+        df[schema.names], schema=schema, preserve_index=False)
+    for c in extra:
+        arrow_table = arrow_table.append_column(c, pa.array(df[c]))
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        pq.write_table(arrow_table, path)
+    elif fmt == 'feather':
+        import pyarrow.feather as feather
+        # Uncompressed so reads can be memory mapped without copying
+        feather.write_feather(arrow_table, path, compression='uncompressed')
+    else:
+        raise ValueError('Unknown storage format: {}'.format(fmt))
+
+    return
+
+
+def apply_schema(df, table):
+    """
+        This method will cast the columns of a table loaded from text (CSV)
+        to the types of its schema.  Columns missing from the table (e.g.
+        created_at of datasets saved before it was kept) are left missing.
+
+        Args:
+            df (pandas.DataFrame): table data
+            table (str): table name (tweets, replies or users)
+
+        Returns:
+            pandas.DataFrame
+    """
+    for name, dtype in SCHEMAS[table]:
+        if name not in df:
+            continue
+        if dtype == 'timestamp':
+            df[name] = pd.to_datetime(
+                df[name], utc=True, errors='coerce').astype(
+                    'datetime64[ns, UTC]')
+        elif dtype in ('int64', 'float64'):
+            values = pd.to_numeric(df[name], errors='coerce')
+            if dtype == 'int64':
+                # Nullable if any value is missing
+                values = values.astype(
+                    'Int64' if values.isna().any() else 'int64')
+            df[name] = values
+
+    return df
+
+
+def load_table(path, fmt='parquet', columns=None, memory_map=False,
+               table=None):
+    """
+        This method will load a single table.
+
+        Args:
+            path (str): file path
+            fmt (str): parquet, feather or csv
+            columns (list): columns to load (all if None)
+            memory_map (bool): memory map the file rather than reading it
+            table (str): table name, CSV columns are cast to its schema
+
+        Returns:
+            pandas.DataFrame
+    """
+    if fmt == 'csv':
+        # TODO: Figure out why empty strings are being saved,
+        #       for now just use na_filter=False
+        df = pd.read_csv(path, usecols=columns, na_filter=False)
+        return apply_schema(df, table) if table else df
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        arrow_table = pq.read_table(
+            path, columns=columns, memory_map=memory_map)
+    elif fmt == 'feather':
+        import pyarrow.feather as feather
+        arrow_table = feather.read_table(
+            path, columns=columns, memory_map=memory_map)
+    else:
+        raise ValueError('Unknown storage format: {}'.format(fmt))
+
+    return arrow_table.to_pandas()
+
+
+def save_dataset(data_path, tweet_df, reply_df, user_df, fmt='parquet'):
+    """
+        This method will save the tweets, replies and users of a dataset.
+
+        Args:
+            data_path (str): path to dataset
+            tweet_df (pandas.DataFrame): tweets
+            reply_df (pandas.DataFrame): replies
+            user_df (pandas.DataFrame): users
+            fmt (str): parquet, feather or csv
+
+        Returns:
+            None
+    """
+    for table, df in zip(TABLES, [tweet_df, reply_df, user_df]):
+        save_table(df, os.path.join(data_path, table + FORMATS[fmt]),
+                   table, fmt=fmt)
+    # Remove tables saved by earlier builds in other formats so loads do
+    # not pick up stale data
+    for other, ext in FORMATS.items():
+        if other != fmt:
+            for table in TABLES:
+                path = os.path.join(data_path, table + ext)
+                if os.path.exists(path):
+                    os.remove(path)
+
+    return
+
+
+def export_csv(data_path, export_path=None):
+    """
+        This method will export a saved dataset to CSV files.
+
+        Args:
+            data_path (str): path to dataset
+            export_path (str): directory the CSV files are written to
+                (defaults to data_path)
+
+        Returns:
+            None
+    """
+    export_path = export_path or data_path
+    fmt = get_format(data_path)
+    if fmt is None:
+        raise FileNotFoundError(
+            'No dataset found in {}'.format(data_path))
+    for table in TABLES:
+        df = load_table(
+            os.path.join(data_path, table + FORMATS[fmt]), fmt=fmt,
+            table=table)
+        df.to_csv(os.path.join(export_path, table + '.csv'), index=False)
+
+    return
+
+
+def load_dataset(data_path, columns=None, memory_map=False):
+    """
+        This method will load the tweets, replies and users of a dataset in
+        whichever format it was saved in.
+
+        Args:
+            data_path (str): path to dataset
+            columns (dict): columns to load per table, e.g.
+                {'tweets': ['id', 'text']} (all columns if not given)
+            memory_map (bool): memory map binary files rather than reading
+
+        Returns:
+            tweet, reply and user DataFrames
+    """
+    columns = columns or {}
+    fmt = get_format(data_path)
+    if fmt is None:
+        raise FileNotFoundError(
+            'No dataset found in {}'.format(data_path))
+
+    return tuple(
+        load_table(os.path.join(data_path, table + FORMATS[fmt]), fmt=fmt,
+                   columns=columns.get(table), memory_map=memory_map,
+                   table=table)
+        for table in TABLES)
+
+
+def _partition_date(path):
+    """
+        Get the date of a history partition directory (date=YYYY-MM-DD).
+    """
+    return pd.Timestamp(os.path.basename(path)[len('date='):]).date()
+
+
+def _utc(timestamp):
+    """
+        Cast a datetime or string to a UTC pandas.Timestamp (naive times are
+        assumed to be UTC).
+    """
+    timestamp = pd.Timestamp(timestamp)
+    if timestamp.tzinfo is None:
+        return timestamp.tz_localize('UTC')
+
+    return timestamp.tz_convert('UTC')
+
+
+def _window_end(end):
+    """
+        Cast the inclusive end of a time window to a UTC pandas.Timestamp.  A
+        date without a time (e.g. '2019-01-02') ends at the end of that day.
+    """
+    timestamp = _utc(end)
+    if isinstance(end, datetime.date) and not isinstance(
+            end, datetime.datetime):
+        date_only = True
+    else:
+        date_only = isinstance(end, str) and len(end.strip()) <= 10
+    if date_only:
+        timestamp += pd.Timedelta(days=1) - pd.Timedelta(1, 'ns')
+
+    return timestamp
+
+
+def append_history(data_path, tables, fmt='parquet'):
+    """
+        This method will append tables to the history store of a dataset.
+        Rows are partitioned by the date in their created_at column (users
+        are given one row per day they tweeted on), or by today's date if
+        there is none.  Each append writes new files, existing partitions are
+        never rewritten.
+
+        The store is laid out as:
+            <data_path>/history/<table>/date=YYYY-MM-DD/part-<ns>.<ext>
+
+        Args:
+            data_path (str): path to dataset
+            tables (dict): map of table name to DataFrame
+            fmt (str): parquet, feather or csv
+
+        Returns:
+            None
+    """
+    part = 'part-{}{}'.format(time.time_ns(), FORMATS[fmt])
+    today = pd.Timestamp.now(tz='UTC').date()
+    for table, df in tables.items():
+        if df.empty:
+            continue
+        if 'created_at' in df:
+            dates = df['created_at'].dt.date
+        else:
+            dates = pd.Series(today, index=df.index)
+        for date, partition in df.groupby(dates):
+            path = os.path.join(
+                data_path, 'history', table, 'date={}'.format(date))
+            if not os.path.exists(path):
+                os.makedirs(path)
+            save_table(partition, os.path.join(path, part), table, fmt=fmt)
+
+    return
+
+
+def load_history(data_path, start=None, end=None, columns=None):
+    """
+        This method will load the tweets, replies and users in a time window
+        from the history store, only reading the partitions in the window.
+        Duplicate tweets and users are dropped, keeping the latest version.
+
+        Args:
+            data_path (str): path to dataset
+            start (datetime or str): start of the window (unbounded if None)
+            end (datetime or str): end of the window, inclusive, a date
+                without a time includes the whole day (unbounded if None)
+            columns (dict): columns to load per table (all if not given)
+
+        Returns:
+            tweet, reply and user DataFrames
+    """
+    columns = columns or {}
+    start = _utc(start) if start is not None else None
+    end = _window_end(end) if end is not None else None
+    dfs = []
+    for table in TABLES:
+        table_path = os.path.join(data_path, 'history', table)
+        partitions = sorted(os.listdir(table_path)) if os.path.exists(
+            table_path) else []
+        # Prune partitions outside of the window
+        partitions = [
+            os.path.join(table_path, p) for p in partitions
+            if (start is None or _partition_date(p) >= start.date()) and
+            (end is None or _partition_date(p) <= end.date())]
+        table_columns = columns.get(table)
+        if table_columns is not None and table != 'users':
+            table_columns = list(dict.fromkeys(
+                list(table_columns) + ['id', 'created_at']))
+        parts = []
+        for partition in partitions:
+            for name in sorted(os.listdir(partition)):
+                fmt = name.split('.')[-1]
+                parts.append((name, load_table(
+                    os.path.join(partition, name), fmt=fmt,
+                    columns=table_columns, table=table)))
+        if not parts:
+            dfs.append(pd.DataFrame(
+                columns=table_columns or [c for c, _ in SCHEMAS[table]]))
+            continue
+        # Order by append time so later versions win
+        parts.sort(key=lambda x: x[0])
+        df = pd.concat([p for _, p in parts], ignore_index=True)
+        if table == 'users':
+            df = df.drop_duplicates('username', keep='last')
+        else:
+            df = df.drop_duplicates('id', keep='last')
+            # Filter the boundary partitions to the exact window
+            if start is not None:
+                df = df.loc[df['created_at'] >= start]
+            if end is not None:
+                df = df.loc[df['created_at'] <= end]
+        dfs.append(df.reset_index(drop=True))
+
+    return tuple(dfs)
@@ -0,0 +1,326 @@
+"""
+This module will run a long running, real time sentiment analysis over a
+stream of tweets, emitting a snapshot of every ticker for each time window.
+"""
+
+import time
+import numpy as np
+import pandas as pd
+from collections import Counter
+from itertools import chain
+from .tweets import classify_tweet
+from .timeseries import FREQUENCIES
+from .sketches import SpaceSaving
+from .twtrconvo import (
+    convert_tweets_to_df, rank_tweets, get_stopwords, filter_tokens,
+    count_ngrams, word_count_to_df, get_sentiment_sums,
+    get_sentiment_from_sums
+)
+
+
+class _LatencyReservoir(object):
+    """
+        Fixed size uniform sample (reservoir) of latencies, along with the
+        exact count and max, so latency percentiles of an unbounded stream
+        are estimated in bounded memory.
+    """
+
+    def __init__(self, size=10000, seed=0):
+        self.size = size
+        self.n = 0
+        self.max = -np.inf
+        self.sample = np.empty(size)
+        self.rng = np.random.default_rng(seed)
+
+    def extend(self, latencies):
+        latencies = np.asarray(latencies, dtype=float)
+        if not len(latencies):
+            return
+        self.max = max(self.max, latencies.max())
+        # Fill the reservoir first
+        n_fill = max(0, min(self.size - self.n, len(latencies)))
+        self.sample[self.n:self.n + n_fill] = latencies[:n_fill]
+        rest = latencies[n_fill:]
+        # Then the i-th latency replaces a random sample with probability
+        # size / i
+        i = self.n + n_fill + np.arange(1, len(rest) + 1)
+        slots = self.rng.integers(0, i)
+        keep = slots < self.size
+        self.sample[slots[keep]] = rest[keep]
+        self.n += len(latencies)
+
+    def stats(self):
+        """
+            Get the p50, p95 and max latency.
+        """
+        if not self.n:
+            return {'p50': np.nan, 'p95': np.nan, 'max': np.nan}
+        sample = self.sample[:min(self.n, self.size)]
+
+        return {
+            'p50': float(np.percentile(sample, 50)),
+            'p95': float(np.percentile(sample, 95)),
+            'max': float(self.max)
+        }
+
+
+class _TickerWindow(object):
+    """
+        Running state of a single ticker over the current time window.
+    """
+
+    def __init__(self, start, n, capacity=None):
+        self.start = start
+        self.sums = None
+        if capacity:
+            self.counters = [SpaceSaving(capacity) for _ in range(n)]
+        else:
+            self.counters = [Counter() for _ in range(n)]
+        self.rows = []
+        self.n_rows = 0
+        self.latencies = _LatencyReservoir()
+
+
+class StreamAnalyzer(object):
+    """
+        Incrementally analyzes a stream of tweets.  Tweets are assigned to
+        tumbling time windows by when they were created, and for every ticker
+        the window's weighted sentiment, top ngrams and top ranked tweets are
+        updated as tweets arrive.  When a tweet from a later window arrives
+        the current window is emitted as a snapshot and its state dropped, so
+        memory is bounded by the size of a window.
+
+        Args:
+            tickers (list): ticker symbols tracked, a tweet counts toward
+                every ticker whose cashtag it mentions (or toward the only
+                ticker if just one is tracked)
+            window (str): window size, e.g. 1m, 5m, 1h or a pandas alias
+            top_k (int): number of top ngrams in each snapshot
+            n_top_tweets (int): number of top ranked tweets in each snapshot
+            ngrams (int): largest ngram size counted
+            max_window_tweets (int): most tweets per ticker and window kept
+                for ranking (newest are kept)
+            weights (list): list of weights corresponding to meta data,
+                uniform if not given
+            extra_stopwords (iterable): custom stopwords
+            processes (int): number of processes used for sentiment scoring
+            cache (SentimentCache): optional persistent sentiment cache
+            capacity (int): if set, approximately count each window's ngrams
+                in fixed memory with this many counters per ngram size
+    """
+
+    def __init__(self, tickers, window='5m', top_k=10, n_top_tweets=10,
+                 ngrams=3, max_window_tweets=10000, weights=None,
+                 extra_stopwords=(), processes=1, cache=None, capacity=None):
+        self.tickers = [t.lstrip('$').upper() for t in tickers]
+        self.window = FREQUENCIES.get(window, window)
+        self.top_k = top_k
+        self.n_top_tweets = n_top_tweets
+        self.ngrams = ngrams
+        self.capacity = capacity
+        self.max_window_tweets = max_window_tweets
+        self.weights = weights
+        self.processes = processes
+        self.cache = cache
+        self.stopword_sets = {
+            t: get_stopwords(t, extra_stopwords) for t in self.tickers}
+        self.windows = {}
+        self.counts = {'tweet': 0, 'reply': 0, 'retweet': 0}
+        # Latencies are sampled so memory stays bounded
+        self.latencies = _LatencyReservoir()
+
+    def _mentions(self, df, ticker):
+        if len(self.tickers) == 1:
+            return np.ones(len(df), dtype=bool)
+        # Cleaned text drops the $ of cashtags, use the raw tweet text
+        return df['tweet'].str.upper().str.contains(
+            '$' + ticker, regex=False).to_numpy()
+
+    def _snapshot(self, ticker, state):
+        sentiment = get_sentiment_from_sums(state.sums, weights=self.weights)
+        rows = pd.concat(state.rows, ignore_index=True)
+        top_tweets = rank_tweets(rows, n=self.n_top_tweets)
+
+        return {
+            'ticker': ticker,
+            'start': state.start,
+            'end': state.start + pd.tseries.frequencies.to_offset(
+                self.window),
+            'volume': int(state.sums['count'].iloc[0]),
+            'polarity': float(sentiment[0, 0]),
+            'subjectivity': float(sentiment[0, 1]),
+            'top_ngrams': [
+                word_count_to_df(counter, top_k=self.top_k)
+                for counter in state.counters],
+            'top_tweets': top_tweets[
+                ['id', 'username', 'tweet', 'polarity', 'subjectivity',
+                 'rank']].reset_index(drop=True),
+            'latency_ms': state.latencies.stats()
+        }
+
+    def _add(self, ticker, start, df, latencies):
+        snapshots = []
+        state = self.windows.get(ticker)
+        # A later window closes the current one (late tweets are added to
+        # the current window)
+        if state is not None and start > state.start:
+            snapshots.append(self._snapshot(ticker, state))
+            state = None
+        if state is None:
+            state = self.windows[ticker] = _TickerWindow(
+                start, self.ngrams, self.capacity)
+        sums = get_sentiment_sums(df)
+        state.sums = sums if state.sums is None else state.sums + sums
+        counts = count_ngrams(chain.from_iterable(
+            filter_tokens(df['text'].values, self.stopword_sets[ticker])),
+            n=self.ngrams)
+        for counter, new in zip(state.counters, counts):
+            counter.update(new)
+        state.rows.append(df)
+        state.n_rows += len(df)
+        # Drop the oldest rows kept for ranking past the limit
+        while state.n_rows - len(state.rows[0]) >= self.max_window_tweets:
+            state.n_rows -= len(state.rows.pop(0))
+        state.latencies.extend(latencies)
+
+        return snapshots
+
+    def process(self, tweets, received=None):
+        """
+            Process a batch of raw tweets.
+
+            Args:
+                tweets (list): list of raw tweet dicts
+                received (list): time.perf_counter() time each tweet was
+                    received, used to measure latency (defaults to now)
+
+            Returns:
+                list of snapshots of the windows closed by this batch
+        """
+        now = time.perf_counter()
+        received = np.asarray(
+            received if received is not None else [now] * len(tweets))
+        kinds = [classify_tweet(t) for t in tweets]
+        for kind in kinds:
+            self.counts[kind] += 1
+        # Sentiment and rankings are built from original tweets
+        originals = [i for i, kind in enumerate(kinds) if kind == 'tweet']
+        if not originals:
+            return []
+        df = convert_tweets_to_df(
+            [tweets[i] for i in originals], processes=self.processes,
+            cache=self.cache)
+        received = received[originals]
+        starts = df['created_at'].dt.floor(self.window)
+        snapshots = []
+        for ticker in self.tickers:
+            mentions = self._mentions(df, ticker)
+            for start in sorted(starts[mentions].unique()):
+                mask = mentions & (starts == start).to_numpy()
+                latencies = (time.perf_counter() - received[mask]) * 1000
+                snapshots += self._add(ticker, start, df.loc[mask], latencies)
+        self.latencies.extend((time.perf_counter() - received) * 1000)
+
+        return snapshots
+
+    def flush(self):
+        """
+            Emit snapshots of the open windows and reset them.
+
+            Returns:
+                list of snapshots
+        """
+        snapshots = [
+            self._snapshot(ticker, state)
+            for ticker, state in self.windows.items()]
+        self.windows = {}
+
+        return snapshots
+
+    def latency_stats(self):
+        """
+            Get the end to end latency of every tweet processed so far
+            (percentiles are estimated from a sample of 10,000 latencies).
+
+            Returns:
+                dict of tweets processed and p50, p95 and max latency in ms
+        """
+        stats = self.latencies.stats()
+        stats['tweets'] = self.latencies.n
+
+        return stats
+
+
+def run_stream(source, tickers, batch_size=1, **kwargs):
+    """
+        This method will run the streaming analysis over a tweet source,
+        yielding snapshots as windows close.
+
+        Args:
+            source (iterable): source of raw tweets, e.g. a
+                sources.TweetSource
+            tickers (list): ticker symbols tracked
+            batch_size (int): number of tweets processed at a time (larger
+                batches trade latency for throughput)
+            kwargs: other StreamAnalyzer arguments (or analyzer, an
+                existing StreamAnalyzer)
+
+        Returns:
+            generator of snapshot dicts
+    """
+    analyzer = kwargs.pop('analyzer', None) or StreamAnalyzer(
+        tickers, **kwargs)
+    batch = []
+    received = []
+    for tweet in source:
+        batch.append(tweet)
+        received.append(time.perf_counter())
+        if len(batch) >= batch_size:
+            yield from analyzer.process(batch, received)
+            batch = []
+            received = []
+    if batch:
+        yield from analyzer.process(batch, received)
+    yield from analyzer.flush()
+
+
+def main(tickers, replay=None, window='5m', batch_size=1, rate=None,
+         capacity=None, processes=1):
+    """
+        This method will run the streaming mode from the command line,
+        printing a summary of every snapshot.
+
+        Args:
+            tickers (list): ticker symbols tracked
+            replay (str): path of a recorded tweet dump to replay (defaults
+                to the live twitter search api of the first ticker)
+            window (str): window size, e.g. 1m, 5m or 1h
+            batch_size (int): number of tweets processed at a time
+            rate (float): tweets per second to replay at (no limit if None)
+            capacity (int): approximately count ngrams with this many
+                counters (exact if None)
+            processes (int): number of processes used for sentiment scoring
+
+        Returns:
+            None
+    """
+    from .sources import FileTweetSource, SearchTweetSource
+
+    if replay:
+        source = FileTweetSource(replay, rate=rate)
+    else:
+        source = SearchTweetSource(tickers[0])
+    analyzer = StreamAnalyzer(tickers, window=window, capacity=capacity,
+                              processes=processes)
+    for snapshot in run_stream(source, tickers, batch_size=batch_size,
+                               analyzer=analyzer):
+        top_words = snapshot['top_ngrams'][0]['word'].values[:5]
+        print('{ticker:<6} {start} volume={volume:<6} '
+              'polarity={polarity:+.3f} subjectivity={subjectivity:.3f} '
+              'p95={p95:.1f}ms top: {words}'.format(
+                  p95=snapshot['latency_ms']['p95'],
+                  words=', '.join(top_words), **snapshot))
+    print('Latency over {tweets} tweets: p50={p50:.1f}ms p95={p95:.1f}ms '
+          'max={max:.1f}ms'.format(**analyzer.latency_stats()))
+
+    return
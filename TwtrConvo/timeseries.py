@@ -0,0 +1,137 @@
+"""
+This module will aggregate tweet sentiment over time, bucketed and rolling
+weighted polarity, subjectivity and tweet volume per ticker.
+"""
+
+import pandas as pd
+from .twtrconvo import get_sentiment_sums, get_sentiment_from_sums
+
+# Short bucket sizes mapped to pandas frequency aliases
+FREQUENCIES = {
+    '1m': '1min',
+    '5m': '5min',
+    '15m': '15min',
+    '1h': '1h',
+    '1d': '1D'
+}
+
+
+class SentimentTimeSeries(object):
+    """
+        Time bucketed sentiment of tweets.  The sums each weighted sentiment
+        is built from are kept per bucket, so new tweets can be added
+        incrementally with update and rolling windows can be computed from
+        the buckets.
+
+        Args:
+            freq (str): bucket size, e.g. 1m, 5m, 1h, 1d or a pandas
+                frequency alias
+            by (str or list): optional column(s) to group by, e.g. ticker
+            weights (list): list of weights corresponding to meta data,
+                uniform if not given
+            sentiment_columns (list): sentiment headers to average
+            weight_columns (list): meta data headers used as weights
+            time_column (str): datetime header tweets are bucketed by
+    """
+
+    def __init__(self, freq='5m', by=None, weights=None,
+                 sentiment_columns=['polarity', 'subjectivity'],
+                 weight_columns=['retweets', 'favorites', 'net_influence'],
+                 time_column='created_at'):
+        self.freq = FREQUENCIES.get(freq, freq)
+        self.by = [by] if isinstance(by, str) else list(by or [])
+        self.weights = weights
+        self.sentiment_columns = sentiment_columns
+        self.weight_columns = weight_columns
+        self.time_column = time_column
+        self.sums = None
+
+    def update(self, df):
+        """
+            Add tweets to the time series.  Tweets should only be added once.
+
+            Args:
+                df (pandas.DataFrame): tweets with a datetime column
+
+            Returns:
+                self
+        """
+        df = df.assign(bucket=df[self.time_column].dt.floor(self.freq))
+        sums = get_sentiment_sums(
+            df, sentiment_columns=self.sentiment_columns,
+            weight_columns=self.weight_columns, by=self.by + ['bucket'])
+        if self.sums is None:
+            self.sums = sums
+        else:
+            # Sums of buckets already seen are added together
+            self.sums = self.sums.add(sums, fill_value=0)
+        self.sums = self.sums.sort_index()
+
+        return self
+
+    def _sentiment(self, sums):
+        sentiment = pd.DataFrame(
+            get_sentiment_from_sums(
+                sums, weights=self.weights,
+                sentiment_columns=self.sentiment_columns,
+                weight_columns=self.weight_columns),
+            index=sums.index, columns=self.sentiment_columns)
+        sentiment['volume'] = sums['count'].astype(int)
+
+        return sentiment
+
+    def buckets(self):
+        """
+            Get the weighted sentiment and tweet volume of every bucket.
+
+            Returns:
+                pandas.DataFrame indexed by group(s) and bucket
+        """
+        if self.sums is None:
+            return pd.DataFrame(columns=self.sentiment_columns + ['volume'])
+
+        return self._sentiment(self.sums)
+
+    def rolling(self, window='1h'):
+        """
+            Get the weighted sentiment and tweet volume over a rolling time
+            window ending at every bucket.
+
+            Args:
+                window (str): window size, e.g. 1h or a pandas offset alias
+
+            Returns:
+                pandas.DataFrame indexed by group(s) and bucket
+        """
+        if self.sums is None:
+            return self.buckets()
+        window = FREQUENCIES.get(window, window)
+        sums = self.sums.reset_index(level='bucket')
+        if self.by:
+            rolled = sums.groupby(level=self.by).rolling(
+                window, on='bucket').sum()
+            # Group keys are repeated by groupby rolling, drop them
+            rolled = rolled.reset_index(level=list(range(len(self.by))),
+                                        drop=True)
+        else:
+            rolled = sums.rolling(window, on='bucket').sum()
+        rolled = rolled.set_index('bucket', append=bool(self.by))
+
+        return self._sentiment(rolled[self.sums.columns])
+
+
+def aggregate_sentiment(df, freq='1h', by=None, **kwargs):
+    """
+        This method will compute the weighted sentiment and tweet volume of
+        tweets in time buckets.
+
+        Args:
+            df (pandas.DataFrame): tweets with a created_at column
+            freq (str): bucket size, e.g. 1m, 5m, 1h or 1d
+            by (str or list): optional column(s) to group by, e.g. ticker
+            kwargs: other SentimentTimeSeries arguments
+
+        Returns:
+            pandas.DataFrame indexed by group(s) and bucket
+    """
+    return SentimentTimeSeries(freq=freq, by=by, **kwargs).update(df).buckets()
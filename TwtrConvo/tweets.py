@@ -3,17 +3,29 @@ This module will be responsible for collecting the tweets.
 """
 
 import os
-import tweepy
+from functools import lru_cache
+from itertools import islice
 
-# Get twitter api keys from environment
-TWITTER_CONSUMER_KEY = os.environ['TWITTER_CONSUMER_KEY']
-TWITTER_CONSUMER_SECRET = os.environ['TWITTER_CONSUMER_SECRET']
-TWITTER_ACCESS_TOKEN = os.environ['TWITTER_ACCESS_TOKEN']
-TWITTER_ACCESS_TOKEN_SECRET = os.environ['TWITTER_ACCESS_TOKEN_SECRET']
-# Initialize tweepy objects
-auth = tweepy.OAuthHandler(TWITTER_CONSUMER_KEY, TWITTER_CONSUMER_SECRET)
-auth.set_access_token(TWITTER_ACCESS_TOKEN, TWITTER_ACCESS_TOKEN_SECRET)
-tweepy_api = tweepy.API(auth, wait_on_rate_limit=True)
+
+@lru_cache(maxsize=None)
+def get_api():
+    """
+        This method will initialize the tweepy api the first time it is
+        needed, using the twitter api keys from the environment.
+
+        Returns:
+            tweepy.API object
+    """
+    import tweepy
+
+    auth = tweepy.OAuthHandler(
+        os.environ['TWITTER_CONSUMER_KEY'],
+        os.environ['TWITTER_CONSUMER_SECRET'])
+    auth.set_access_token(
+        os.environ['TWITTER_ACCESS_TOKEN'],
+        os.environ['TWITTER_ACCESS_TOKEN_SECRET'])
+
+    return tweepy.API(auth, wait_on_rate_limit=True)
 
 
 def filter_tweets(tweet_list, filter_retweets=True, filter_replies=True):
@@ -31,71 +43,117 @@ def filter_tweets(tweet_list, filter_retweets=True, filter_replies=True):
     filtered_list = []
     # Iterate over tweet list and apply conditions
     for t in tweet_list:
-        conditions = []
-        # Add retweet filter condition if selected
-        if filter_retweets:
-            conditions.append(
-                (not t['retweeted']) and
-                (t['full_text'][0:2] != 'RT'))
-        # Add reply filter condition if selected
-        if filter_replies:
-            conditions.append(
-                not t['in_reply_to_status_id'])
+        # Skip retweets if selected
+        if filter_retweets and (
+                t['retweeted'] or t['full_text'][0:2] == 'RT'):
+            continue
         # If filter_replies is set to False, method will return only replies
-        else:
-            conditions.append(
-                t['in_reply_to_status_id'] is not None)
-
-        # If all conditions met, add tweet to filtered list
-        if sum(conditions) == len(conditions):
-            filtered_list.append(t)
+        if filter_replies:
+            if t['in_reply_to_status_id']:
+                continue
+        elif t['in_reply_to_status_id'] is None:
+            continue
+        filtered_list.append(t)
 
     return filtered_list
 
 
-def get_tweets(ticker, max_tweets=2500):
+def partition_tweets(tweet_list):
     """
-        This method will get tweets given a ticker symbol.
+        This method will split a list of tweets into original tweets,
+        replies and retweets in a single pass.
 
         Args:
-            ticker (str): stock / crypto ticker symbol
-            count (int): number of latest tweets to pull
+            tweet_list (list): list of tweets
 
         Returns:
-            list of tweets
+            lists of tweets, replies and retweets
     """
+    tweets, replies, retweets = [], [], []
+    add_tweet, add_reply, add_retweet = (
+        tweets.append, replies.append, retweets.append)
+    for t in tweet_list:
+        if t['retweeted'] or t['full_text'][0:2] == 'RT':
+            add_retweet(t)
+        elif t['in_reply_to_status_id'] is not None:
+            add_reply(t)
+        else:
+            add_tweet(t)
 
-    # Add $ to beginning of string if not already $
-    if ticker[0] != '$':
-        ticker = '$' + ticker
-    # Get tweets
-    tweet_list = [
-        status for status in
-        tweepy.Cursor(
-            tweepy_api.search,
-            q=ticker,
-            tweet_mode='extended').items(max_tweets)
-    ]
-    # Convert tweets to json format
-    tweet_list = _convert_to_json(tweet_list)
-    # Filter out retweets and replies
-    tweets = filter_tweets(tweet_list)
-    # Get all tweets classified as replies
-    replies = filter_tweets(tweet_list, filter_replies=False)
+    return tweets, replies, retweets
 
-    return tweets, replies
 
+def classify_tweet(tweet):
+    """
+        This method will classify a tweet as an original tweet, a reply or a
+        retweet.
 
-def _convert_to_json(tweet_list):
+        Args:
+            tweet (dict): tweet
+
+        Returns:
+            'tweet', 'reply' or 'retweet'
     """
-        Convert a list of tweepy tweet objects to json format.
+    if tweet['retweeted'] or tweet['full_text'][0:2] == 'RT':
+        return 'retweet'
+    if tweet['in_reply_to_status_id'] is not None:
+        return 'reply'
+
+    return 'tweet'
+
+
+def stream_tweets(ticker, max_tweets=2500, source=None, chunksize=1000,
+                  since_id=None):
+    """
+        This method will stream tweets given a ticker symbol, classifying
+        the tweets as they arrive and yielding them in bounded size chunks.
 
         Args:
-            tweet_list (list): list of tweepy tweet objects
+            ticker (str): stock / crypto ticker symbol
+            max_tweets (int): number of latest tweets to pull
+            source (sources.TweetSource): source of raw tweets (defaults to
+                the live twitter search api)
+            chunksize (int): number of tweets per chunk
+            since_id (int): only stream tweets newer than this id
 
         Returns:
-            modified list in json format
+            generator of (tweets, replies, retweets) list tuples
+    """
+    from .sources import SearchTweetSource
+
+    if source is None:
+        source = SearchTweetSource(
+            ticker, max_tweets=max_tweets, since_id=since_id)
+    # Sources yield tweets in json format
+    tweets = iter(source)
+    if since_id is not None:
+        tweets = (t for t in tweets if t['id'] > since_id)
+    tweets = islice(tweets, max_tweets)
+    while True:
+        chunk = list(islice(tweets, chunksize))
+        if not chunk:
+            return
+        yield partition_tweets(chunk)
+
+
+def get_tweets(ticker, max_tweets=2500, source=None):
     """
-    tweet_list = [i._json for i in tweet_list]
+        This method will get tweets given a ticker symbol.
+
+        Args:
+            ticker (str): stock / crypto ticker symbol
+            max_tweets (int): number of latest tweets to pull
+            source (sources.TweetSource): source of raw tweets (defaults to
+                the live twitter search api)
 
-    return tweet_list
+        Returns:
+            list of tweets and list of replies (retweets are filtered out)
+    """
+    tweets = []
+    replies = []
+    for tweet_chunk, reply_chunk, _ in stream_tweets(
+            ticker, max_tweets=max_tweets, source=source):
+        tweets += tweet_chunk
+        replies += reply_chunk
+
+    return tweets, replies
@@ -8,68 +8,79 @@ sentiment analysis package TwtrConvo.
 
 # System imports
 import os
-import sys
-import argparse
 import pandas as pd
 import numpy as np
-import json
 import re
-from textblob import TextBlob
-from nltk.corpus import stopwords
-from sklearn import preprocessing as sk 
-# local imports
-from .tweets import get_tweets
-from .plots import (
-    create_pie_chart, create_sentiment_gauge, create_boxplot,
-    create_distplot, create_user_description_scatter, create_2d_histogram,
-    create_violin_plot, create_contour
-)
-
-
-def convert_tweets_to_df(tweet_list, replies=False):
+import json
+import time
+import hashlib
+import inspect
+import multiprocessing
+from functools import lru_cache
+from itertools import chain
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+# local imports (textblob, nltk and plotly are imported where needed, they
+# are slow to import)
+from .tweets import stream_tweets
+from .sentiment import get_sentiment, SentimentCache
+from . import storage
+from .sources import TWITTER_TIME_FORMAT
+from .sketches import SpaceSaving
+
+# Matches mentions, special characters and links
+CLEAN_REGEX = re.compile(r"(@[A-Za-z0-9]+)|([^0-9A-Za-z \t])|(\w+:\/\/\S+)")
+
+
+def convert_tweets_to_df(tweet_list, replies=False, processes=1, cache=None):
     """
-        This method will cast the list of tweets to a DataFrame
+        This method will cast the list of tweets to a DataFrame.  Each field
+        is pulled out of the tweet dicts into a typed column and the frame is
+        built once, rather than filled in row by row.
 
         Args:
             tweet_list (list): list of tweets
             replies (bool): whether or not df is replies
+            processes (int): number of processes used for sentiment scoring
+            cache (SentimentCache): optional persistent sentiment cache
 
         Returns:
             pandas.DataFrame of tweets with various fields
     """
     columns = ['id', 'username', 'user_id','tweet', 'text', 'favorites', 'retweets',
-               'followers', 'following', 'polarity', 'subjectivity']
+               'followers', 'following', 'polarity', 'subjectivity',
+               'created_at']
     if replies:
         columns += ['reply_id']
-    df = pd.DataFrame(
-        index=range(len(tweet_list)),
-        columns=columns)
-    index = 0
-    for tweet in tweet_list:
-        cleaned_text = clean_text(tweet['full_text'])
-        # Create TextBlob to get sentiment results
-        blob = TextBlob(cleaned_text)
-        # Build row
-        values = [
-            tweet['id'],
-            tweet['user']['screen_name'],
-            tweet['user']['id'],
-            tweet['full_text'],
-            cleaned_text,
-            tweet['favorite_count'],
-            tweet['retweet_count'],
-            tweet['user']['followers_count'],
-            tweet['user']['friends_count'],
-            blob.sentiment.polarity,
-            blob.sentiment.subjectivity
-        ]
-        # If replies==True, include foreign key
-        if replies:
-            values.append(
-                tweet['in_reply_to_status_id'])
-
-        df.loc[index, columns] = values
-        index += 1
+    # Clean text and get sentiment results
+    cleaned_text = clean_texts([tweet['full_text'] for tweet in tweet_list])
+    polarity, subjectivity = get_sentiment(
+        cleaned_text, processes=processes, cache=cache)
+    # Build columns
+    data = {
+        'id': _int_column(tweet_list, lambda t: t['id']),
+        'username': [t['user']['screen_name'] for t in tweet_list],
+        'user_id': _int_column(tweet_list, lambda t: t['user']['id']),
+        'tweet': [t['full_text'] for t in tweet_list],
+        'text': cleaned_text,
+        'favorites': _int_column(tweet_list, lambda t: t['favorite_count']),
+        'retweets': _int_column(tweet_list, lambda t: t['retweet_count']),
+        'followers': _int_column(
+            tweet_list, lambda t: t['user']['followers_count']),
+        'following': _int_column(
+            tweet_list, lambda t: t['user']['friends_count']),
+        'polarity': polarity,
+        'subjectivity': subjectivity,
+        'created_at': pd.to_datetime(
+            [t.get('created_at') for t in tweet_list],
+            format=TWITTER_TIME_FORMAT, utc=True).astype(
+                'datetime64[ns, UTC]')
+    }
+    # If replies==True, include foreign key (nullable, may be missing)
+    if replies:
+        data['reply_id'] = pd.array(
+            [t['in_reply_to_status_id'] for t in tweet_list], dtype='Int64')
+    df = pd.DataFrame(data, columns=columns)
     # Create column for net influence
     df['net_influence'] = df['followers'] - df['following']
     # Filter invalid tweets
@@ -78,6 +89,22 @@ def convert_tweets_to_df(tweet_list, replies=False):
     return df
 
 
+def _int_column(tweet_list, getter):
+    """
+        Pull an integer field out of every tweet into an int64 array.
+
+        Args:
+            tweet_list (list): list of tweets
+            getter (function): returns the field value for a single tweet
+
+        Returns:
+            numpy.ndarray of int64 values
+    """
+    return np.fromiter(
+        (getter(t) for t in tweet_list), dtype=np.int64,
+        count=len(tweet_list))
+
+
 def clean_text(tweet):
     """
         Utility function to clean tweet text by removing links, special
@@ -89,31 +116,54 @@ def clean_text(tweet):
         Returns:
             cleaned text
     """
-    regx = re.compile("(@[A-Za-z0-9]+)|([^0-9A-Za-z \t])|(\w+:\/\/\S+)")
-    return ' '.join(re.sub(regx, " ", tweet).split()) 
+    return ' '.join(CLEAN_REGEX.sub(' ', tweet).split())
 
 
-def rank_tweets(tweet_df, n=100):
+def clean_texts(texts):
+    """
+        Clean a list of texts in a single pass.  The cleaned text only
+        contains alphanumeric words separated by single spaces, so it is
+        tokenized once, lazily, by filter_tokens when words are counted.
+
+        Args:
+            texts (list): list of text strings
+
+        Returns:
+            list of cleaned text strings
+    """
+    return [' '.join(CLEAN_REGEX.sub(' ', text).split()) for text in texts]
+
+
+def rank_tweets(tweet_df, n=100, weights=[1, 1, 1]):
     """
         Get top n ranked tweets based on net influence (net followers),
-        retweets, and favorites.
-        TODO: Add weighting
+        retweets, and favorites.  The composite rank is the weighted sum of
+        the rank of each metric, and only the top n rows are selected and
+        copied (without sorting the whole DataFrame).
 
         Args:
             tweet_df (pandas.DataFrame): DataFrame of tweets
             n (int): top number of ranked tweets to take
+            weights (list): weight of net influence, retweets and favorites
 
         Returns:
             n top ranked tweets
     """
     cols = ['net_influence', 'retweets', 'favorites']
-    ranked_cols = {c: c + 'rank' for c in cols}
-    ranks = tweet_df[cols].rank().rename(columns=ranked_cols)
-    tweet_df = pd.concat([tweet_df, ranks], axis=1)
-    tweet_df['rank'] = tweet_df[list(ranked_cols.values())].sum(axis=1)
-    tweet_df.sort_values('rank', ascending=False, inplace=True)
+    ranks = tweet_df[cols].rank().to_numpy(dtype=np.float64)
+    rank = np.nan_to_num(ranks) @ np.asarray(weights, dtype=np.float64)
+    # Partially select the top n, then only sort those
+    if n < len(rank):
+        top = np.argpartition(-rank, n - 1)[:n]
+    else:
+        top = np.arange(len(rank))
+    top = top[np.argsort(-rank[top], kind='stable')]
+    tweet_df = tweet_df.iloc[top].copy()
+    for i, c in enumerate(cols):
+        tweet_df[c + 'rank'] = ranks[top, i]
+    tweet_df['rank'] = rank[top]
 
-    return tweet_df.head(n)
+    return tweet_df
 
 
 def get_user_info_df(tweet_list, ids=[]):
@@ -129,7 +179,7 @@ def get_user_info_df(tweet_list, ids=[]):
             user information DataFrame
     """
     # Cast user data to DataFrame
-    user_df = pd.DataFrame(
+    user_df = pd.DataFrame.from_dict(
         {i['user']['screen_name']: {
             'user_id': i['user']['id'],
             'full_description': i['user']['description'],
@@ -137,11 +187,12 @@ def get_user_info_df(tweet_list, ids=[]):
             'following': i['user']['friends_count'],
             'favorites': i['user']['favourites_count'],
             'tweet_count': i['user']['statuses_count']
-            } for i in tweet_list}).T.reset_index()
+            } for i in tweet_list}, orient='index',
+        columns=['user_id', 'full_description', 'followers', 'following',
+                 'favorites', 'tweet_count']).reset_index()
     user_df.rename(columns={'index': 'username'}, inplace=True)
     # Clean full descriptions
-    user_df['description'] = [
-        clean_text(d) for d in user_df['full_description']]
+    user_df['description'] = clean_texts(user_df['full_description'])
     user_df['net_influence'] = user_df['followers'] - user_df['following']
     # If list of ids are passed in, filter by this list
     if ids:
@@ -150,66 +201,308 @@ def get_user_info_df(tweet_list, ids=[]):
     return user_df
 
 
-def build_dataset(ticker, data_path=''):
+def build_dataset(ticker, data_path='', processes=1, cache=None,
+                  source=None, max_tweets=2500, chunksize=1000,
+                  incremental=False, fmt='parquet', history=False):
     """
         This method will build a dataset for a given ticker.
 
         Args:
             ticker (str): company ticker symbol
-            save (bool): switch for whether to save the dataset
+            data_path (str): path the dataset is saved to (not saved if empty)
+            processes (int): number of processes used for sentiment scoring
+            cache (SentimentCache): optional persistent sentiment cache
+            source (sources.TweetSource): source of raw tweets (defaults to
+                the live twitter search api)
+            max_tweets (int): number of latest tweets to pull
+            chunksize (int): number of raw tweets processed at a time
+            incremental (bool): only pull tweets newer than the last build
+                and merge them into the saved dataset
+            fmt (str): storage format, parquet, feather or csv
+            history (bool): also append every pulled tweet, reply and user to
+                the time partitioned history store (in the same format)
 
         Returns:
             tweet and reply DataFrames
     """
-    # Get tweets (returns latest tweets in dict)
-    tweet_list, reply_list = get_tweets(ticker)
-    # --- Metrics for tweet ranking ---
-    tweet_df = convert_tweets_to_df(tweet_list)
-    reply_df = convert_tweets_to_df(reply_list, replies=True)
+    tweet_dfs, reply_dfs, user_dfs = [], [], []
+    since_id = None
+    # Start from the saved dataset and its checkpoint if building
+    # incrementally
+    if incremental and data_path:
+        since_id = load_checkpoint(data_path)
+        if since_id is not None and storage.get_format(data_path):
+            old_tweet_df, old_reply_df, old_user_df = load_dataset(data_path)
+            tweet_dfs.append(old_tweet_df)
+            reply_dfs.append(old_reply_df)
+            user_dfs.append(old_user_df)
+    max_id = since_id
+    # Only the newly pulled chunks are appended to the history store
+    n_saved = len(tweet_dfs)
+    # Stream tweets in chunks, only keeping the DataFrames built from each
+    # chunk rather than the raw tweets (retweets are filtered out)
+    for tweet_list, reply_list, retweet_list in stream_tweets(
+            ticker, max_tweets=max_tweets, source=source,
+            chunksize=chunksize, since_id=since_id):
+        # --- Metrics for tweet ranking ---
+        tweet_dfs.append(convert_tweets_to_df(
+            tweet_list, processes=processes, cache=cache))
+        reply_dfs.append(convert_tweets_to_df(
+            reply_list, replies=True, processes=processes, cache=cache))
+        if tweet_list:
+            user_dfs.append(get_user_info_df(tweet_list))
+        max_id = max(
+            [t['id'] for t in chain(tweet_list, reply_list, retweet_list)] +
+            ([max_id] if max_id is not None else []))
+    if history and data_path:
+        history_tweet_df = _concat_chunks(
+            tweet_dfs[n_saved:], convert_tweets_to_df([]))
+        history_user_df = _concat_chunks(
+            user_dfs[n_saved:], get_user_info_df([]))
+        # Users are stored in the partition of every day they tweeted on
+        # (as of their latest tweet that day), so any window of tweets
+        # finds its users
+        tweet_times = history_tweet_df[['user_id', 'created_at']]
+        tweet_times = tweet_times.groupby(
+            [tweet_times['user_id'], tweet_times['created_at'].dt.date],
+            as_index=False)['created_at'].max()
+        history_user_df = history_user_df.drop_duplicates(
+            'user_id', keep='last').drop(
+                columns='created_at', errors='ignore').merge(
+                    tweet_times, on='user_id', how='left')
+        storage.append_history(data_path, {
+            'tweets': history_tweet_df,
+            'replies': _concat_chunks(
+                reply_dfs[n_saved:], convert_tweets_to_df([], replies=True)),
+            'users': history_user_df
+        }, fmt=fmt)
+    # Merge chunks, newer rows replace older rows of the same tweet
+    tweet_df = _concat_chunks(tweet_dfs, convert_tweets_to_df([]), 'id')
+    reply_df = _concat_chunks(
+        reply_dfs, convert_tweets_to_df([], replies=True), 'id')
+    if user_dfs:
+        user_df = pd.concat(user_dfs, ignore_index=True)
+    else:
+        user_df = get_user_info_df([])
+    tweet_df, reply_df, user_df = select_top_tweets(
+        tweet_df, reply_df, user_df)
+    # Save tweets, replies, and user information
+    if data_path:
+        storage.save_dataset(
+            data_path, tweet_df, reply_df, user_df, fmt=fmt)
+        if max_id is not None:
+            save_checkpoint(data_path, max_id)
+
+    return tweet_df, reply_df, user_df
+
+
+def select_top_tweets(tweet_df, reply_df, user_df, n=100):
+    """
+        This method will select the top ranked tweets along with the replies
+        to them and the latest information of their users.
+
+        Args:
+            tweet_df (pandas.DataFrame): tweets
+            reply_df (pandas.DataFrame): replies
+            user_df (pandas.DataFrame): users
+            n (int): top number of ranked tweets to take
+
+        Returns:
+            tweet, reply and user DataFrames
+    """
     # Only get highest ranked tweets
-    tweet_df = rank_tweets(tweet_df)
+    tweet_df = rank_tweets(tweet_df, n=n)
     # Get replies to top tweets
     reply_df = reply_df.loc[
         reply_df['reply_id'].isin(tweet_df['id'].values)]
-    # Get user information
-    user_df = get_user_info_df(
-        tweet_list, ids=list(tweet_df['user_id'].unique()))
-    # Save tweets, replies, and user information
-    if data_path:
-        tweet_df.to_csv(os.path.join(data_path, 'tweets.csv'),
-                        index=False)
-        reply_df.to_csv(os.path.join(data_path, 'replies.csv'),
-                        index=False)
-        user_df.to_csv(os.path.join(data_path, 'users.csv'),
-                       index=False)
+    # Get user information (latest information of each user)
+    user_df = user_df.drop_duplicates('username', keep='last')
+    user_df = user_df.loc[user_df['user_id'].isin(tweet_df['user_id'])]
 
     return tweet_df, reply_df, user_df
 
 
-def load_dataset(data_path):
+def _concat_chunks(dfs, empty, key=None):
+    """
+        Concatenate DataFrames built from chunks of tweets, numbering the
+        index column as if they were built from a single list.
+
+        Args:
+            dfs (list): list of DataFrames
+            empty (pandas.DataFrame): result if there are no DataFrames
+            key (str): optional column to drop duplicates by, keeping the
+                last row
+
+        Returns:
+            pandas.DataFrame
+    """
+    # Skip empty chunks, they may not have the same dtypes
+    dfs = [df for df in dfs if len(df)]
+    if not dfs:
+        return empty
+    df = pd.concat(
+        [df.reindex(columns=empty.columns) for df in dfs], ignore_index=True)
+    # Frames saved before a time column was kept (or loaded from CSV) leave
+    # it missing or as strings, cast it back so it can be saved
+    for c in empty.columns:
+        if isinstance(empty[c].dtype, pd.DatetimeTZDtype):
+            df[c] = pd.to_datetime(
+                df[c], utc=True, errors='coerce').astype(empty[c].dtype)
+    if key:
+        df = df.drop_duplicates(key, keep='last').reset_index(drop=True)
+    if 'index' in df:
+        df['index'] = np.arange(len(df))
+
+    return df
+
+
+def load_checkpoint(data_path):
+    """
+        This method will load the id of the newest tweet pulled by the last
+        build of a dataset.
+
+        Args:
+            data_path (str): path to dataset
+
+        Returns:
+            newest tweet id (None if there is no checkpoint)
+    """
+    path = os.path.join(data_path, 'checkpoint.json')
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)['since_id']
+
+
+def save_checkpoint(data_path, since_id):
+    """
+        This method will save the id of the newest tweet pulled for a
+        dataset, so the next incremental build only pulls newer tweets.
+
+        Args:
+            data_path (str): path to dataset
+            since_id (int): newest tweet id
+
+        Returns:
+            None
+    """
+    with open(os.path.join(data_path, 'checkpoint.json'), 'w') as f:
+        json.dump({'since_id': int(since_id)}, f)
+
+    return
+
+
+# Columns select_top_tweets ranks and joins tables by
+RANKING_COLUMNS = {
+    'tweets': ['id', 'user_id', 'retweets', 'favorites', 'net_influence'],
+    'replies': ['id', 'reply_id'],
+    'users': ['username', 'user_id']
+}
+
+
+def load_dataset(data_path, columns=None, memory_map=False, start=None,
+                 end=None):
     """
-        This method will load a previously built dataset.
-        TODO: Figure out why empty strings are being saved,
-              for now just use na_filter=False
+        This method will load a previously built dataset.  If a time window
+        is given, the tweets in that window are loaded from the history store
+        instead (only reading the partitions in the window) and ranked.
 
         Args:
             data_path (str): path to dataset
+            columns (dict): columns to load per table, e.g.
+                {'tweets': ['id', 'text']} (all columns if not given), with a
+                window the columns needed for ranking are also read
+            memory_map (bool): memory map binary files rather than reading
+            start (datetime or str): start of the time window
+            end (datetime or str): end of the time window, inclusive (a date
+                includes the whole day)
 
         Returns:
             tweet and reply DataFrames
     """
-    # Load tweets
-    tweet_df = pd.read_csv(os.path.join(data_path, 'tweets.csv'),
-                           na_filter=False)
-    reply_df = pd.read_csv(os.path.join(data_path, 'replies.csv'),
-                           na_filter=False)
-    user_df = pd.read_csv(os.path.join(data_path, 'users.csv'),
-                          na_filter=False)
+    if start is None and end is None:
+        return storage.load_dataset(
+            data_path, columns=columns, memory_map=memory_map)
+    # Also load the columns tweets are ranked and joined by, then only keep
+    # the requested columns
+    columns = columns or {}
+    load_columns = {
+        table: list(dict.fromkeys(
+            list(table_columns) + RANKING_COLUMNS[table]))
+        for table, table_columns in columns.items()}
+    dfs = select_top_tweets(*storage.load_history(
+        data_path, start=start, end=end, columns=load_columns))
+
+    return tuple(
+        df[list(columns[table])] if table in columns else df
+        for table, df in zip(storage.TABLES, dfs))
+
+
+@lru_cache(maxsize=None)
+def _english_stopwords():
+    """
+        Load the NLTK english stopwords once as a set.
+    """
+    from nltk.corpus import stopwords
 
-    return tweet_df, reply_df, user_df
+    return frozenset(stopwords.words('english'))
+
+
+def get_stopwords(ticker='', extra_stopwords=()):
+    """
+        This method will build the set of stopwords filtered out of the text,
+        the english stopwords plus the ticker and any custom stopwords.
+
+        Args:
+            ticker (str): ticker symbol
+            extra_stopwords (iterable): custom stopwords for the ticker
+
+        Returns:
+            set of lowercase stopwords
+    """
+    stopword_set = set(_english_stopwords())
+    stopword_set.update(word.lower() for word in extra_stopwords)
+    if ticker:
+        stopword_set.add(ticker.lower())
+
+    return stopword_set
+
+
+def load_stopwords(path):
+    """
+        This method will load a custom stopword list, one word per line.
+
+        Args:
+            path (str): path to stopword file
+
+        Returns:
+            list of stopwords (empty if the file does not exist)
+    """
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def filter_tokens(texts, stopword_set):
+    """
+        This method will lazily tokenize cleaned texts and filter out
+        stopwords and numbers, one text at a time.
+
+        Args:
+            texts (iterable): cleaned text strings
+            stopword_set (set): stopwords to filter out
+
+        Returns:
+            generator of filtered lowercase token lists
+    """
+    for text in texts:
+        yield [
+            word for word in text.lower().split()
+            if (word not in stopword_set) and (not word.isnumeric())]
 
 
-def get_blob(ticker, df, header='text'):
+def get_blob(ticker, df, header='text', extra_stopwords=()):
     """
         This method will take a DataFrame of tweets and turn all the text into
         a single TextBlob.
@@ -218,131 +511,641 @@ def get_blob(ticker, df, header='text'):
             ticker (str): ticker symbol
             df (pandas.DataFrame): data with text
             header (str): header of text column
+            extra_stopwords (iterable): custom stopwords for the ticker
 
         Returns:
             textblob.TextBlob object of all text from tweets
     """
-    # Create initial blob
-    blob = TextBlob(' '.join(df[header].values).lower())
-    # Filter by stopwords
-    filtered_words = [
-        word for word in blob.words
-        if (word not in stopwords.words('english')) and
-        (not word.isnumeric()) and
-        (word != ticker.lower())]
-    # Create new blob without stop words
-    blob = TextBlob(' '.join(filtered_words))
+    from textblob import TextBlob
+
+    stopword_set = get_stopwords(ticker, extra_stopwords)
+    # Create blob without stop words
+    blob = TextBlob(' '.join(
+        word for words in filter_tokens(df[header].values, stopword_set)
+        for word in words))
 
     return blob
 
 
-def get_word_count(blob, n=1):
+def get_corpus_sentiment(ticker, df, header='text', extra_stopwords=()):
     """
-        This method will build a word count DataFrame given a text blob.
+        This method will calculate the sentiment of all text from tweets
+        without stop words, as the sentiment of the get_blob TextBlob.  The
+        lexicon assessments of every text are pooled instead of building a
+        single string of the whole corpus, so only negations and modifiers
+        spanning two texts are scored differently.
 
         Args:
-            blob (textblob.TextBlob): blob of all words from tweets
-            n (int): number of ngrams
+            ticker (str): ticker symbol
+            df (pandas.DataFrame): data with text
+            header (str): header of text column
+            extra_stopwords (iterable): custom stopwords for the ticker
+
+        Returns:
+            tuple of polarity and subjectivity
+    """
+    # The lexicon TextBlob's default PatternAnalyzer scores text with
+    from textblob.en import sentiment as pattern_sentiment
+
+    stopword_set = get_stopwords(ticker, extra_stopwords)
+    polarity, subjectivity, n = 0.0, 0.0, 0
+    for words in filter_tokens(df[header].values, stopword_set):
+        assessments = pattern_sentiment(' '.join(words)).assessments
+        polarity += sum(a[1] for a in assessments)
+        subjectivity += sum(a[2] for a in assessments)
+        n += len(assessments)
+
+    return polarity / (n or 1), subjectivity / (n or 1)
+
+
+def count_ngrams(tokens, n=3, capacity=None):
+    """
+        This method will count all 1..n-grams in a single streaming pass over
+        a stream of tokens, only keeping a window of the last n tokens.
+
+        Args:
+            tokens (iterable): stream of tokens
+            n (int): largest ngram size
+            capacity (int): if set, approximately count the ngrams in fixed
+                memory with this many counters per ngram size (see
+                sketches.SpaceSaving)
+
+        Returns:
+            list of collections.Counter (or sketches.SpaceSaving), the i-th
+            counts (i + 1)-grams keyed by token tuples
+    """
+    window = deque(maxlen=n)
+    if capacity:
+        counters = [SpaceSaving(capacity) for _ in range(n)]
+        adds = [counter.add for counter in counters]
+        for token in tokens:
+            window.append(token)
+            ngram = tuple(window)
+            for i in range(len(ngram)):
+                adds[i](ngram[len(ngram) - i - 1:])
+
+        return counters
+
+    counters = [Counter() for _ in range(n)]
+    for token in tokens:
+        window.append(token)
+        ngram = tuple(window)
+        # Count every ngram ending at this token
+        for i in range(len(ngram)):
+            counters[i][ngram[len(ngram) - i - 1:]] += 1
+
+    return counters
+
+
+def word_count_to_df(counter, top_k=None):
+    """
+        This method will cast ngram counts to a word count DataFrame.
+
+        Args:
+            counter (collections.Counter or sketches.SpaceSaving): ngram
+                counts keyed by token tuples
+            top_k (int): only keep the top k ngrams (all if None)
 
         Returns:
             word count pandas.DataFrame
     """
-    # Get the count of each words
-    count_dict = {}
-    for ngram in blob.ngrams(n=n):
-        term = ' '.join(ngram)
-        if term in count_dict:
-            count_dict[term] += 1
-        else:
-            count_dict[term] = 1
-    # Cast to DataFrame
+    # most_common uses a heap when only the top k are requested
     word_count = pd.DataFrame(
-        data=list(count_dict.items()),
-        columns=['word', 'count']).sort_values('count', ascending=False)
-    # Reset index of word count df
-    word_count = word_count.reset_index(drop=True)
+        data=[(' '.join(ngram), count)
+              for ngram, count in counter.most_common(top_k)],
+        columns=['word', 'count'])
 
     return word_count
 
 
-def get_weighted_sentiment(df, weights=[1 / 3] * 3):
+def get_word_count(blob, n=1, top_k=None, capacity=None):
     """
-        This method will calculate a weighted sentiment based on tweets meta
-        data and their provided weights.
+        This method will build a word count DataFrame given a text blob.
+
+        Args:
+            blob (textblob.TextBlob or iterable): blob of all words from tweets
+                or a stream of tokens
+            n (int): number of ngrams
+            top_k (int): only keep the top k ngrams (all if None)
+            capacity (int): if set, approximately count the ngrams in fixed
+                memory, every ngram occurring more than (number of tokens) /
+                capacity times is kept and its count is overestimated by at
+                most (number of tokens) / capacity
+
+        Returns:
+            word count pandas.DataFrame
+    """
+    # Tokens of a TextBlob are its space separated cleaned words
+    tokens = blob.raw.split() if hasattr(blob, 'raw') else blob
+    counter = count_ngrams(tokens, n=n, capacity=capacity)[n - 1]
+
+    return word_count_to_df(counter, top_k=top_k)
+
+
+def get_sentiment_sums(
+    df, sentiment_columns=['polarity', 'subjectivity'],
+    weight_columns=['retweets', 'favorites', 'net_influence'], by=None):
+    """
+        This method will compute the sums a weighted sentiment is built from,
+        the weighted sum of every sentiment column over every weight column,
+        the sum of every weight and sentiment column and the row count.  Sums
+        can be added together, so they can be combined across chunks of
+        tweets or time buckets.
 
         Args:
             df (pandas.DataFrame): tweets
-            weights (list): list of weights corresponding to meta data
+            sentiment_columns (list): sentiment headers to average
+            weight_columns (list): meta data headers used as weights
+            by (str or list): optional column(s) to group by, e.g. ticker
 
         Returns:
-            weighted sentiment
+            pandas.DataFrame of sums, with one row per group if by is given
+    """
+    n = len(df)
+    k = len(sentiment_columns)
+    m = len(weight_columns)
+    values = df[sentiment_columns].to_numpy(dtype=np.float64)
+    weight_values = df[weight_columns].to_numpy(dtype=np.float64)
+    # Stack weighted values, weights, values and counts so all sums needed
+    # are taken in one pass (per group if grouping)
+    stacked = np.hstack([
+        (values[:, :, None] * weight_values[:, None, :]).reshape(n, k * m),
+        weight_values, values, np.ones((n, 1))])
+    columns = (
+        ['weighted_{}_{}'.format(s, w)
+         for s in sentiment_columns for w in weight_columns] +
+        ['weight_{}'.format(w) for w in weight_columns] +
+        ['sum_{}'.format(s) for s in sentiment_columns] + ['count'])
+    if by is None:
+        return pd.DataFrame(
+            stacked.sum(axis=0, keepdims=True), columns=columns)
+    keys = [df[c] for c in ([by] if isinstance(by, str) else by)]
+
+    return pd.DataFrame(
+        stacked, index=df.index, columns=columns).groupby(keys).sum()
+
+
+def get_sentiment_from_sums(
+    sums, weights=None, sentiment_columns=['polarity', 'subjectivity'],
+    weight_columns=['retweets', 'favorites', 'net_influence']):
     """
-    sentiment = np.array([0.0, 0.0])
-    sentiment_keys = ['polarity', 'subjectivity']
-    headers = ['retweets', 'favorites', 'net_influence']
-    for i in range(2):
-        value = sentiment_keys[i]
-        for j in range(3):
-            h = headers[j]
-            scaled_value = np.average(df[value], weights=df[h])
-            sentiment[i] += weights[j] * scaled_value
+        This method will calculate the weighted sentiment from the sums built
+        by get_sentiment_sums.  A plain average is used where a weight column
+        sums to zero or less (e.g. mostly negative net influence), where a
+        weighted average is undefined or meaningless.
 
-    sentiment = sentiment / 3
+        Args:
+            sums (pandas.DataFrame): sentiment sums
+            weights (list): list of weights corresponding to meta data,
+                uniform if not given
+            sentiment_columns (list): sentiment headers to average
+            weight_columns (list): meta data headers used as weights
+
+        Returns:
+            numpy.ndarray of weighted sentiment, one row per row of sums
+    """
+    k = len(sentiment_columns)
+    m = len(weight_columns)
+    if weights is None:
+        weights = [1 / m] * m
+    elif len(weights) != m:
+        raise ValueError(
+            'Expected {} weights, one per weight column, got {}'.format(
+                m, len(weights)))
+    sums = sums.to_numpy(dtype=np.float64).reshape(len(sums), -1)
+    weighted_sums = sums[:, :k * m].reshape(-1, k, m)
+    weight_sums = sums[:, k * m:k * m + m]
+    value_sums = sums[:, k * m + m:k * m + m + k]
+    counts = sums[:, -1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        means = np.where(
+            weight_sums[:, None, :] > 0,
+            weighted_sums / weight_sums[:, None, :],
+            (value_sums / counts[:, None])[:, :, None])
+    sentiment = means @ np.asarray(weights, dtype=np.float64) / m
 
     return sentiment
 
 
-def save_figures(html_path, figures):
+def get_weighted_sentiment(
+    df, weights=None, sentiment_columns=['polarity', 'subjectivity'],
+    weight_columns=['retweets', 'favorites', 'net_influence'], by=None):
+    """
+        This method will calculate a weighted sentiment based on tweets meta
+        data and their provided weights.  The weighted average of every
+        sentiment column over every weight column is computed at once, then
+        combined using the metric weights.  Negative weights (e.g. net
+        influence) are kept as is, and a plain average is used where a weight
+        column sums to zero or less.
+
+        Args:
+            df (pandas.DataFrame): tweets
+            weights (list): list of weights corresponding to meta data,
+                uniform if not given
+            sentiment_columns (list): sentiment headers to average
+            weight_columns (list): meta data headers used as weights
+            by (str or list): optional column(s) to group by, e.g. ticker
+
+        Returns:
+            weighted sentiment numpy.ndarray, or a pandas.DataFrame with one
+            row per group if by is given
+    """
+    sums = get_sentiment_sums(
+        df, sentiment_columns=sentiment_columns,
+        weight_columns=weight_columns, by=by)
+    sentiment = get_sentiment_from_sums(
+        sums, weights=weights, sentiment_columns=sentiment_columns,
+        weight_columns=weight_columns)
+
+    if by is None:
+        return sentiment[0]
+
+    return pd.DataFrame(
+        sentiment, index=sums.index, columns=sentiment_columns)
+
+
+EXPORT_MODES = ['pages', 'shared', 'dashboard', 'json']
+
+DASHBOARD_TEMPLATE = """<html>
+<head><meta charset="utf-8" /><title>{title}</title>
+<script src="plotly.min.js"></script></head>
+<body>
+{divs}
+</body>
+</html>
+"""
+
+
+def _write_plotlyjs(html_path):
+    """
+        Write the shared plotly.js bundle once, only rewriting it when the
+        installed plotly version changes.
+    """
+    from plotly.offline import get_plotlyjs, get_plotlyjs_version
+
+    js_path = os.path.join(html_path, 'plotly.min.js')
+    version_path = js_path + '.version'
+    version = get_plotlyjs_version()
+    if os.path.exists(js_path) and os.path.exists(version_path):
+        with open(version_path) as f:
+            if f.read() == version:
+                return
+    with open(js_path, 'w', encoding='utf-8') as f:
+        f.write(get_plotlyjs())
+    with open(version_path, 'w') as f:
+        f.write(version)
+
+    return
+
+
+def _render_figure(figure_name, fig, html_path, mode):
+    """
+        Serialize a single figure, writing it to its own file unless it is
+        part of a dashboard.
+
+        Returns:
+            html div of the figure for dashboards, otherwise the path written
+    """
+    from .plots import figure_to_html, figure_to_json
+
+    if mode == 'dashboard':
+        return figure_to_html(fig, include_plotlyjs=False, full_html=False,
+                              div_id=figure_name)
+    if mode == 'json':
+        path = os.path.join(html_path, '{}.json'.format(figure_name))
+        data = figure_to_json(fig)
+    else:
+        # Pages reference the shared plotly.js bundle next to them
+        path = os.path.join(html_path, '{}.html'.format(figure_name))
+        data = figure_to_html(fig, include_plotlyjs='directory')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(data)
+
+    return path
+
+
+def save_figures(html_path, figures, mode='shared', processes=1,
+                 title='TwtrConvo'):
     """
-        This method will save the figures to interactive html files using
-        plotly's offline mode.
+        This method will save the figures to interactive html files.
+        Figures are serialized to compact JSON in parallel worker processes.
+
+        Modes:
+            pages: standalone html pages each embedding plotly.js (opened
+                with plotly's offline mode)
+            shared: an html page per figure, all loading one shared
+                plotly.min.js
+            dashboard: a single dashboard.html of every figure, loading the
+                shared plotly.min.js
+            json: a compact plotly JSON file per figure
 
         Args:
             html_path (str): path to where plots will be saved
             figures (dict): map of plotly figure dicts
+            mode (str): export mode
+            processes (int): number of processes used to serialize figures
+            title (str): title of the dashboard
 
         Returns:
             None
     """
-    from plotly.offline import download_plotlyjs, init_notebook_mode, plot
-    from plotly import tools
+    if mode not in EXPORT_MODES:
+        raise ValueError('Unknown export mode {!r}, expected one of '
+                         '{}'.format(mode, ', '.join(EXPORT_MODES)))
+    if mode == 'pages':
+        from plotly.offline import plot
 
-    for figure_name, fig in figures.items():
+        for figure_name, fig in figures.items():
             # Save plotly figure to html
             plot(fig, filename=os.path.join(
                 html_path, '{}.html'.format(figure_name)))
 
+        return
+    if mode in ('shared', 'dashboard'):
+        _write_plotlyjs(html_path)
+    names = list(figures)
+    args = (names, [figures[name] for name in names],
+            [html_path] * len(names), [mode] * len(names))
+    if processes > 1 and len(names) > 1:
+        with ProcessPoolExecutor(
+                max_workers=min(processes, len(names))) as executor:
+            rendered = list(executor.map(_render_figure, *args))
+    else:
+        rendered = list(map(_render_figure, *args))
+    if mode == 'dashboard':
+        with open(os.path.join(html_path, 'dashboard.html'), 'w',
+                  encoding='utf-8') as f:
+            f.write(DASHBOARD_TEMPLATE.format(
+                title=title, divs='\n'.join(rendered)))
+
     return
 
 
-def add_user_data(user_word_count, user_df):
+def _hash_value(sha, value):
     """
-        This method will add data to the word count DataFrame.
+        Add a figure input to a running hash.  DataFrames and arrays are
+        hashed by their values, other inputs by their repr.
     """
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        columns = value.columns if isinstance(value, pd.DataFrame) else [
+            value.name]
+        sha.update(repr((type(value).__name__, list(columns),
+                         [str(d) for d in np.atleast_1d(value.dtypes)]))
+                   .encode('utf-8'))
+        sha.update(pd.util.hash_pandas_object(value).values.tobytes())
+    elif isinstance(value, np.ndarray):
+        sha.update(repr((value.dtype.str, value.shape)).encode('utf-8'))
+        sha.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, (list, tuple)):
+        sha.update('{}{}'.format(type(value).__name__, len(value)).encode())
+        for v in value:
+            _hash_value(sha, v)
+    elif isinstance(value, dict):
+        sha.update('dict{}'.format(len(value)).encode())
+        for k in sorted(value):
+            _hash_value(sha, k)
+            _hash_value(sha, value[k])
+    else:
+        sha.update(repr(value).encode('utf-8'))
+
+    return
 
-    # Add avg net influence of users with each word in their description
-    user_word_count['avg_net_influence'] = np.nan
 
-    for index, row in user_word_count.iterrows():
-        word_in_description = user_df['description'].apply(
-            lambda x: row['word'] in x.lower())
-        user_word_count.loc[index, 'avg_net_influence'] = user_df.loc[
-            word_in_description, 'net_influence'].mean()
+@lru_cache(maxsize=None)
+def _source_hash(path):
+    """
+        Hash the source of a module, so figures are rebuilt when the code
+        building them changes.
+    """
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def get_figure_hash(builder, args=(), kwargs={}, salt=''):
+    """
+        This method will hash everything a figure is built from, the function
+        building it and the source of its module, its arguments (e.g.
+        DataFrame slices) and a salt of other settings (e.g. export mode and
+        versions).
+
+        Args:
+            builder (function): function building the figure
+            args (tuple): positional arguments of the builder
+            kwargs (dict): keyword arguments of the builder
+            salt (str): other settings the output depends on
+
+        Returns:
+            hex digest str
+    """
+    sha = hashlib.sha1()
+    sha.update('{}.{}:{}'.format(
+        builder.__module__, builder.__qualname__, salt).encode('utf-8'))
+    try:
+        sha.update(_source_hash(inspect.getsourcefile(builder)).encode())
+    except (TypeError, OSError):
+        # Builders without a source file are hashed by their bytecode
+        code = getattr(builder, '__code__', None)
+        if code is not None:
+            sha.update(code.co_code)
+            sha.update(repr(code.co_consts).encode('utf-8'))
+    _hash_value(sha, tuple(args))
+    _hash_value(sha, dict(kwargs))
+
+    return sha.hexdigest()
+
+
+def load_manifest(html_path):
+    """
+        This method will load the manifest of rendered figures.
+
+        Args:
+            html_path (str): path to where plots are saved
+
+        Returns:
+            dict of figure name to its hash and file (empty if none)
+    """
+    path = os.path.join(html_path, 'manifest.json')
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f).get('figures', {})
+
+
+def save_manifest(html_path, manifest):
+    """
+        This method will save the manifest of rendered figures.
+
+        Args:
+            html_path (str): path to where plots are saved
+            manifest (dict): figure name to its hash and file
+
+        Returns:
+            None
+    """
+    path = os.path.join(html_path, 'manifest.json')
+    # Write to a temporary file first so a crash never leaves a partial
+    # manifest
+    with open(path + '.tmp', 'w') as f:
+        json.dump({'figures': manifest}, f, indent=1, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+    return
+
+
+def _figure_file(figure_name, mode):
+    """
+        Get the file a figure is saved to in an export mode.
+    """
+    if mode == 'dashboard':
+        return 'dashboard.html'
+    if mode == 'json':
+        return '{}.json'.format(figure_name)
+
+    return '{}.html'.format(figure_name)
+
+
+def render_figures(html_path, specs, mode='shared', processes=1,
+                   title='TwtrConvo', force=False):
+    """
+        This method will build and save only the figures whose inputs have
+        changed since they were last saved.  Each figure is hashed from its
+        builder (and its source code) and inputs, and the hashes of saved
+        figures are kept in manifest.json in html_path.  A figure is skipped
+        if its hash matches the manifest and its file still exists.  A
+        dashboard is rebuilt as a whole if any of its figures changed.
+
+        Args:
+            html_path (str): path to where plots will be saved
+            specs (dict): map of figure name to a (builder, args, kwargs)
+                tuple, the figure is built with builder(*args, **kwargs)
+            mode (str): export mode (see save_figures)
+            processes (int): number of processes used to serialize figures
+            title (str): title of the dashboard
+            force (bool): build and save every figure
+
+        Returns:
+            list of names of the figures saved
+    """
+    import plotly
+    from . import __version__, plots
+
+    # Figures are also serialized by the plots module
+    salt = '{}:{}:{}:{}'.format(mode, __version__, plotly.__version__,
+                                _source_hash(plots.__file__))
+    manifest = {} if force else load_manifest(html_path)
+    hashes = {name: get_figure_hash(builder, args, kwargs, salt=salt)
+              for name, (builder, args, kwargs) in specs.items()}
+    stale = [
+        name for name in specs
+        if manifest.get(name, {}).get('hash') != hashes[name] or
+        not os.path.exists(os.path.join(
+            html_path, _figure_file(name, mode)))]
+    if mode == 'dashboard' and stale:
+        stale = list(specs)
+    figures = {}
+    for name in stale:
+        builder, args, kwargs = specs[name]
+        figures[name] = builder(*args, **kwargs)
+    if figures:
+        save_figures(html_path, figures, mode=mode, processes=processes,
+                     title=title)
+    elif mode in ('shared', 'dashboard'):
+        # Restore the shared plotly.js even if no figure changed
+        _write_plotlyjs(html_path)
+    manifest.update({
+        name: {'hash': hashes[name], 'file': _figure_file(name, mode)}
+        for name in stale})
+    save_manifest(html_path, manifest)
+
+    return stale
+
+
+def get_description_index(user_df):
+    """
+        This method will build an inverted index of the words in the user
+        descriptions, one row per distinct (word, user) pair.
+
+        Args:
+            user_df (pandas.DataFrame): user information
+
+        Returns:
+            pandas.DataFrame with word, user_id and net_influence columns
+    """
+    index = pd.DataFrame({
+        'word': user_df['description'].str.lower().str.split(),
+        'user_id': user_df['user_id'],
+        'net_influence': user_df['net_influence'].astype(float)
+    }).explode('word')
+    index = index.loc[~index['word'].isnull()].drop_duplicates(
+        ['word', 'user_id'])
+
+    return index.reset_index(drop=True)
+
+
+def add_user_data(user_word_count, user_df, substring_match=False):
+    """
+        This method will add data to the word count DataFrame.
+
+        Args:
+            user_word_count (pandas.DataFrame): user description word counts
+            user_df (pandas.DataFrame): user information
+            substring_match (bool): match words anywhere in the description
+                (including inside other words) rather than by whole token
+
+        Returns:
+            word count DataFrame with avg_net_influence column
+    """
+    # Add avg net influence of users with each word in their description
+    if substring_match:
+        descriptions = user_df['description'].str.lower()
+        net_influence = user_df['net_influence'].astype(float)
+        user_word_count['avg_net_influence'] = [
+            net_influence.loc[
+                descriptions.str.contains(word, regex=False)].mean()
+            for word in user_word_count['word']]
+    else:
+        avg_net_influence = get_description_index(user_df).groupby(
+            'word')['net_influence'].mean()
+        user_word_count['avg_net_influence'] = user_word_count['word'].map(
+            avg_net_influence).astype(float)
 
     return user_word_count
 
 
-def main(ticker, build):
+def main(ticker, build, processes=1, incremental=False, fmt='parquet',
+         history=False, start=None, end=None, export='shared', force=False):
     """
         This method will drive the primary functionality of the package.
 
         Args:
             ticker (str): company ticker symbol
             build (bool): boolean to build or load data
+            processes (int): number of processes used for sentiment scoring
+                and figure export
+            incremental (bool): only pull new tweets and merge them into the
+                saved dataset when building
+            fmt (str): storage format of built datasets, parquet, feather or
+                csv
+            history (bool): append pulled tweets to the history store when
+                building
+            start (datetime or str): start of the time window analyzed from
+                the history store
+            end (datetime or str): end of the time window analyzed from the
+                history store
+            export (str): figure export mode, pages, shared, dashboard or
+                json (see save_figures)
+            force (bool): render every figure, even if its inputs have not
+                changed since it was last rendered
 
         Returns:
             None
     """
+    from .plots import (
+        create_pie_chart, create_sentiment_gauge, create_boxplot,
+        create_distplot, create_user_description_scatter,
+        create_2d_histogram, create_violin_plot, create_contour
+    )
+
     # Initialize data path
     data_path = os.path.join('datasets', ticker)
     # If build, get new tweets and save them
@@ -350,22 +1153,38 @@ def main(ticker, build):
         # If dataset path does not exist, create it
         if not os.path.exists(data_path):
             os.makedirs(data_path)
-        # Build dataset
-        tweet_df, reply_df, user_df = build_dataset(
-            ticker, data_path=data_path)
+        # Build dataset, reusing sentiment scores from previous builds
+        cache_path = os.path.join('datasets', 'sentiment_cache.db')
+        with SentimentCache(cache_path) as cache:
+            tweet_df, reply_df, user_df = build_dataset(
+                ticker, data_path=data_path, processes=processes,
+                cache=cache, incremental=incremental, fmt=fmt,
+                history=history)
+            print('Sentiment cache: {hits} hits, {misses} misses '
+                  '({hit_rate:.1%} hit rate)'.format(**cache.stats()))
     # Otherwise, load previously collected tweets
     else:
-        # Load dataset
-        tweet_df, reply_df, user_df = load_dataset(data_path)
-    # Get text blobs and word count
-    tweet_blob = get_blob(ticker, tweet_df)
-    tweet_word_count = get_word_count(tweet_blob)
-    tweet_bigram_count = get_word_count(tweet_blob, n=2)
-    tweet_trigram_count = get_word_count(tweet_blob, n=3)
-    reply_blob = get_blob(ticker, reply_df)
-    reply_word_count = get_word_count(reply_blob)
-    user_blob = get_blob(ticker, user_df, header='description')
-    user_word_count = get_word_count(user_blob)
+        # Load dataset (or the window of the history store)
+        tweet_df, reply_df, user_df = load_dataset(
+            data_path, start=start, end=end)
+    # Load custom stopwords for this ticker
+    extra_stopwords = load_stopwords(os.path.join(data_path, 'stopwords.txt'))
+    stopword_set = get_stopwords(ticker, extra_stopwords)
+    # Get overall sentiment of all tweet text
+    tweet_sentiment = get_corpus_sentiment(
+        ticker, tweet_df, extra_stopwords=extra_stopwords)
+    # Get word counts, counting all tweet ngrams in one pass.  Only the top
+    # words plotted are kept (10 per pie chart, 15 in the user scatter)
+    tweet_counts = count_ngrams(chain.from_iterable(
+        filter_tokens(tweet_df['text'].values, stopword_set)), n=3)
+    tweet_word_count = word_count_to_df(tweet_counts[0], top_k=10)
+    tweet_bigram_count = word_count_to_df(tweet_counts[1], top_k=10)
+    tweet_trigram_count = word_count_to_df(tweet_counts[2], top_k=10)
+    reply_word_count = get_word_count(chain.from_iterable(
+        filter_tokens(reply_df['text'].values, stopword_set)), top_k=10)
+    user_word_count = get_word_count(chain.from_iterable(
+        filter_tokens(user_df['description'].values, stopword_set)),
+        top_k=15)
     user_word_count = add_user_data(user_word_count, user_df)
     weighted_sentiment = get_weighted_sentiment(tweet_df)
     # --- Create plotly HTML files ---
@@ -374,29 +1193,116 @@ def main(ticker, build):
     if not os.path.exists(html_path):
         os.makedirs(html_path)
     # -- Create Figures --
+    # Figures are built from (builder, args, kwargs), only passing the
+    # columns used so unchanged inputs can be detected and skipped
     figures = {}
-    figures['word_count_pie_chart'] = create_pie_chart(
-        tweet_word_count, reply_word_count)
-    figures['ngram_count_pie_chart'] = create_pie_chart(
-        tweet_bigram_count, tweet_trigram_count, name_1='bigrams',
-        name_2='trigrams')
-    figures['sentiment_guage'] = create_sentiment_gauge(
-        tweet_blob.sentiment.polarity, tweet_blob.sentiment.subjectivity)
-    figures['weighted_sentiment_guage'] = create_sentiment_gauge(
-        weighted_sentiment[0], weighted_sentiment[1])
-    figures['retweets_favs_boxplots'] = create_boxplot(tweet_df)
-    figures['sentiment_boxplots'] = create_boxplot(
-        tweet_df, columns=['polarity', 'subjectivity'], title='Sentiment')
-    figures['sentiment_violin_plot'] = create_violin_plot(
-        tweet_df, ['polarity', 'subjectivity'], 'Sentiment Violin Plot')
-    figures['user_influence_distplot'] = create_distplot(user_df)
-    figures['user_description_scatter'] = create_user_description_scatter(
-        user_word_count)
-    figures['user_activity_heatmap'] = create_2d_histogram(
-        user_df, 'net_influence', 'tweet_count',
-        'User Activity vs. Influence')
-    figures['retweets_polarity_contour'] = create_contour(tweet_df)
-    # -- Save figures as html files --
-    save_figures(html_path, figures)
+    figures['word_count_pie_chart'] = (
+        create_pie_chart, (tweet_word_count, reply_word_count), {})
+    figures['ngram_count_pie_chart'] = (
+        create_pie_chart, (tweet_bigram_count, tweet_trigram_count),
+        {'name_1': 'bigrams', 'name_2': 'trigrams'})
+    figures['sentiment_guage'] = (
+        create_sentiment_gauge, tweet_sentiment, {})
+    figures['weighted_sentiment_guage'] = (
+        create_sentiment_gauge,
+        (weighted_sentiment[0], weighted_sentiment[1]), {})
+    figures['retweets_favs_boxplots'] = (
+        create_boxplot, (tweet_df[['retweets', 'favorites']],), {})
+    figures['sentiment_boxplots'] = (
+        create_boxplot, (tweet_df[['polarity', 'subjectivity']],),
+        {'columns': ['polarity', 'subjectivity'], 'title': 'Sentiment'})
+    figures['sentiment_violin_plot'] = (
+        create_violin_plot,
+        (tweet_df[['polarity', 'subjectivity']], ['polarity', 'subjectivity'],
+         'Sentiment Violin Plot'), {})
+    figures['user_influence_distplot'] = (
+        create_distplot, (user_df[['net_influence']],), {})
+    figures['user_description_scatter'] = (
+        create_user_description_scatter, (user_word_count,), {})
+    figures['user_activity_heatmap'] = (
+        create_2d_histogram,
+        (user_df[['net_influence', 'tweet_count']], 'net_influence',
+         'tweet_count', 'User Activity vs. Influence'), {})
+    figures['retweets_polarity_contour'] = (
+        create_contour, (tweet_df[['retweets', 'polarity']],), {})
+    # -- Save changed figures as html files --
+    rendered = render_figures(html_path, figures, mode=export,
+                              processes=processes, title=ticker,
+                              force=force)
+    print('Rendered {} of {} figures'.format(len(rendered), len(figures)))
 
     return
+
+
+def _timed_main(ticker, build, kwargs):
+    """
+        Run main for a single ticker and time it.
+
+        Returns:
+            ticker, elapsed seconds and error message (None if successful)
+    """
+    start = time.perf_counter()
+    try:
+        main(ticker, build, **kwargs)
+        error = None
+    except Exception as e:
+        error = '{}: {}'.format(type(e).__name__, e)
+
+    return ticker, time.perf_counter() - start, error
+
+
+def load_tickers(path):
+    """
+        This method will load a list of tickers, one ticker per line.
+
+        Args:
+            path (str): path to ticker file
+
+        Returns:
+            list of tickers
+    """
+    with open(path) as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def run_batch(tickers, build, workers=None, **kwargs):
+    """
+        This method will run the analysis for a list of tickers in parallel
+        worker processes.  Modules and stopwords are loaded once before the
+        workers are started so they are shared with every ticker.
+
+        Args:
+            tickers (list): list of ticker symbols
+            build (bool): boolean to build or load data
+            workers (int): number of tickers analyzed in parallel (None for
+                all cores)
+            kwargs: other keyword arguments passed to main for every ticker
+
+        Returns:
+            list of (ticker, seconds, error) tuples
+    """
+    # Load heavy modules, the sentiment lexicon (loaded on first use) and
+    # stopwords before forking so each worker shares them rather than
+    # loading them again
+    from textblob import TextBlob
+    from . import plots
+    TextBlob('warm up').sentiment
+    _english_stopwords()
+    # Sharing preloaded state needs fork, which is not the default start
+    # method everywhere
+    context = None
+    if 'fork' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('fork')
+    start = time.perf_counter()
+    with ProcessPoolExecutor(
+            max_workers=workers, mp_context=context) as executor:
+        results = list(executor.map(
+            _timed_main, tickers, [build] * len(tickers),
+            [kwargs] * len(tickers)))
+    # Print timing summary
+    print('{:<10} {:>10}  {}'.format('ticker', 'seconds', 'status'))
+    for ticker, seconds, error in results:
+        print('{:<10} {:>10.2f}  {}'.format(ticker, seconds, error or 'ok'))
+    print('{:<10} {:>10.2f}'.format('total', time.perf_counter() - start))
+
+    return results
@@ -0,0 +1,73 @@
+"""
+Benchmark for twtrconvo.convert_tweets_to_df.
+
+Compares the columnar DataFrame builder against the original row-by-row
+implementation on synthetic tweets.
+
+Usage:
+    python benchmarks/bench_convert_tweets.py [n ...]
+"""
+
+import os
+import sys
+import timeit
+import pandas as pd
+from textblob import TextBlob
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from TwtrConvo.twtrconvo import convert_tweets_to_df, clean_text
+from TwtrConvo.sources import SyntheticTweetSource
+
+
+def legacy_convert_tweets_to_df(tweet_list, replies=False):
+    """
+        Original row-by-row implementation, kept for comparison.
+    """
+    columns = ['id', 'username', 'user_id','tweet', 'text', 'favorites',
+               'retweets', 'followers', 'following', 'polarity',
+               'subjectivity']
+    if replies:
+        columns += ['reply_id']
+    df = pd.DataFrame(index=range(len(tweet_list)), columns=columns)
+    index = 0
+    for tweet in tweet_list:
+        cleaned_text = clean_text(tweet['full_text'])
+        blob = TextBlob(cleaned_text)
+        values = [
+            tweet['id'],
+            tweet['user']['screen_name'],
+            tweet['user']['id'],
+            tweet['full_text'],
+            cleaned_text,
+            tweet['favorite_count'],
+            tweet['retweet_count'],
+            tweet['user']['followers_count'],
+            tweet['user']['friends_count'],
+            blob.sentiment.polarity,
+            blob.sentiment.subjectivity
+        ]
+        if replies:
+            values.append(tweet['in_reply_to_status_id'])
+        df.loc[index, columns] = values
+        index += 1
+    df['net_influence'] = df['followers'] - df['following']
+    df = df.loc[~df['text'].isnull()].reset_index()
+
+    return df
+
+
+def main(sizes):
+    print('{:>8} {:>12} {:>12} {:>8}'.format(
+        'tweets', 'legacy (s)', 'columnar (s)', 'speedup'))
+    for n in sizes:
+        tweets = list(SyntheticTweetSource('TSLA', n=n))
+        legacy = timeit.timeit(
+            lambda: legacy_convert_tweets_to_df(tweets), number=1)
+        columnar = timeit.timeit(
+            lambda: convert_tweets_to_df(tweets), number=1)
+        print('{:>8} {:>12.3f} {:>12.3f} {:>7.1f}x'.format(
+            n, legacy, columnar, legacy / columnar))
+
+
+if __name__ == '__main__':
+    main([int(n) for n in sys.argv[1:]] or [1000, 10000, 100000])
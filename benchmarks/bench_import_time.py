@@ -0,0 +1,70 @@
+"""
+Benchmark for the import time of the TwtrConvo package.
+
+Runs each import statement in a fresh interpreter with `python -X importtime`
+and reports the cumulative import time along with the slowest modules.
+
+Usage:
+    python benchmarks/bench_import_time.py [repeat]
+"""
+
+import os
+import sys
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STATEMENTS = [
+    'import TwtrConvo',
+    'from TwtrConvo.twtrconvo import load_dataset',
+    'from TwtrConvo import tweets',
+    'from TwtrConvo import plots',
+]
+
+
+def import_times(statement):
+    """
+        Get the import time of a statement and of the modules it imports.
+
+        Args:
+            statement (str): python import statement
+
+        Returns:
+            total microseconds and list of (module, microseconds) tuples of
+            the top level imports, slowest first
+    """
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        env=env, stderr=subprocess.PIPE, universal_newlines=True, check=True)
+    total = 0
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, module = line[len('import time:'):].split('|')
+        # Nested imports are indented, their time is included in the parent
+        if module[1:2] != ' ':
+            total += int(cumulative)
+            times.append((module.strip(), int(cumulative)))
+
+    return total, sorted(times, key=lambda x: x[1], reverse=True)
+
+
+def main(repeat):
+    # Baseline interpreter startup, subtracted from each statement
+    startup, startup_times = min(
+        import_times('pass') for _ in range(repeat))
+    startup_modules = set(m for m, _ in startup_times)
+    for statement in STATEMENTS:
+        runs = [import_times(statement) for _ in range(repeat)]
+        total, times = min(runs)
+        times = [(m, t) for m, t in times if m not in startup_modules]
+        print('{:<48} {:>8.1f} ms (best of {})'.format(
+            statement, max(total - startup, 0) / 1000, repeat))
+        for module, t in times[:3]:
+            print('    {:<44} {:>8.1f} ms'.format(module, t / 1000))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 3)
@@ -0,0 +1,65 @@
+"""
+Benchmark for tweets.partition_tweets.
+
+Compares the single pass partition into tweets, replies and retweets against
+the original two pass filter_tweets implementation.
+
+Usage:
+    python benchmarks/bench_partition_tweets.py [n ...]
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from TwtrConvo.tweets import partition_tweets
+from TwtrConvo.sources import SyntheticTweetSource
+
+
+def legacy_filter_tweets(tweet_list, filter_retweets=True,
+                         filter_replies=True):
+    """
+        Original filter_tweets implementation, kept for comparison.
+    """
+    filtered_list = []
+    for t in tweet_list:
+        conditions = []
+        if filter_retweets:
+            conditions.append(
+                (not t['retweeted']) and
+                (t['full_text'][0:2] != 'RT'))
+        if filter_replies:
+            conditions.append(
+                not t['in_reply_to_status_id'])
+        else:
+            conditions.append(
+                t['in_reply_to_status_id'] is not None)
+        if sum(conditions) == len(conditions):
+            filtered_list.append(t)
+
+    return filtered_list
+
+
+def legacy_partition(tweet_list):
+    return (legacy_filter_tweets(tweet_list),
+            legacy_filter_tweets(tweet_list, filter_replies=False))
+
+
+def main(sizes, repeat=5):
+    print('{:>8} {:>14} {:>14} {:>8}'.format(
+        'tweets', 'two pass (ms)', 'one pass (ms)', 'speedup'))
+    for n in sizes:
+        tweets = list(SyntheticTweetSource('TSLA', n=n))
+        # Both versions must agree on tweets and replies
+        assert legacy_partition(tweets) == partition_tweets(tweets)[:2]
+        legacy = min(timeit.repeat(
+            lambda: legacy_partition(tweets), number=1, repeat=repeat))
+        single = min(timeit.repeat(
+            lambda: partition_tweets(tweets), number=1, repeat=repeat))
+        print('{:>8} {:>14.2f} {:>14.2f} {:>7.1f}x'.format(
+            n, legacy * 1000, single * 1000, legacy / single))
+
+
+if __name__ == '__main__':
+    main([int(n) for n in sys.argv[1:]] or [1000, 10000, 100000])
@@ -0,0 +1,78 @@
+"""
+Benchmark for rendering many figures, e.g. one per ticker and time window.
+
+Builds and serializes 1,000 pie chart, sentiment gauge and contour figures,
+comparing serializing them as validated plotly figures (as plotly does by
+default) against plots.figure_to_json, which skips validation of the dict
+based figures built from the shared templates.
+
+Usage:
+    python benchmarks/bench_render_figures.py [n ...]
+"""
+
+import os
+import sys
+import json
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+import plotly.graph_objs as go
+from TwtrConvo.plots import (
+    create_pie_chart, create_sentiment_gauge, create_contour, figure_to_json
+)
+
+
+def build_figures(n, seed=0):
+    rng = np.random.default_rng(seed)
+    words = ['word{}'.format(i) for i in range(50)]
+    figures = []
+    for i in range(n):
+        kind = i % 3
+        if kind == 0:
+            counts = np.sort(rng.integers(1, 500, 50))[::-1]
+            word_count = pd.DataFrame({'word': words, 'count': counts})
+            figures.append(create_pie_chart(word_count, word_count))
+        elif kind == 1:
+            figures.append(create_sentiment_gauge(
+                rng.uniform(-1, 1), rng.uniform(0, 1)))
+        else:
+            df = pd.DataFrame({
+                'retweets': rng.poisson(5, 200),
+                'polarity': rng.uniform(-1, 1, 200)})
+            figures.append(create_contour(df))
+
+    return figures
+
+
+def validated_to_json(fig):
+    return pio.to_json(go.Figure(fig), pretty=False)
+
+
+def main(sizes):
+    print('{:>8} {:>10} {:>15} {:>15} {:>8}'.format(
+        'figures', 'build (s)', 'validated (s)', 'templated (s)', 'speedup'))
+    for n in sizes:
+        start = time.perf_counter()
+        figures = build_figures(n)
+        build = time.perf_counter() - start
+        # Both must serialize the same figure
+        fig = figures[-1]
+        assert (json.loads(validated_to_json(fig))['layout'] ==
+                json.loads(figure_to_json(fig))['layout'])
+        start = time.perf_counter()
+        for fig in figures:
+            validated_to_json(fig)
+        validated = time.perf_counter() - start
+        start = time.perf_counter()
+        for fig in figures:
+            figure_to_json(fig)
+        templated = time.perf_counter() - start
+        print('{:>8} {:>10.2f} {:>15.2f} {:>15.2f} {:>7.1f}x'.format(
+            n, build, validated, templated, validated / templated))
+
+
+if __name__ == '__main__':
+    main([int(n) for n in sys.argv[1:]] or [1000])